@@ -0,0 +1,86 @@
+"""
+Benchmark standard PDF text extraction: pages/sec versus worker count.
+
+    python -m loadtest.bench_pdf_extraction --pages 1000 --workers 1,2,4,8
+    python -m loadtest.bench_pdf_extraction --pdf annual_report.pdf
+
+Runs ProcessFileUtils.extract_pdf_pages on a generated (or given) PDF with
+Config.PDF_EXTRACTION_WORKERS set to each worker count; 1 is the serial path.
+Each count gets a warm-up run so worker start-up is not measured, then the best
+of --repeat runs is reported and written to loadtest/results/.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def run_benchmark(pdf_path: str, worker_counts: List[int], repeat: int) -> List[Dict]:
+    from src.config import Config
+    from src.utils.process_file_utils import ProcessFileUtils
+    from src.utils.pdf_page_extractor import reset_pdf_extraction_pool
+
+    utils = ProcessFileUtils()
+    # Benchmark the parallel path for every multi-worker count, whatever the PDF size
+    Config.PDF_PARALLEL_MIN_PAGES = 0
+    rows, reference_text = [], None
+    for workers in worker_counts:
+        Config.PDF_EXTRACTION_WORKERS = workers
+        reset_pdf_extraction_pool()
+        pages = utils.extract_pdf_pages(pdf_path)
+        text = "".join(pages)
+        if reference_text is None:
+            reference_text = text
+        elif text != reference_text:
+            raise RuntimeError(f"Extracted text with {workers} workers differs from the serial result")
+        timings = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            utils.extract_pdf_pages(pdf_path)
+            timings.append(time.perf_counter() - started_at)
+        best = min(timings)
+        rows.append({"workers": workers, "pages": len(pages), "seconds": round(best, 4), "pages_per_second": round(len(pages) / best, 1)})
+    reset_pdf_extraction_pool()
+    baseline = rows[0]["pages_per_second"]
+    for row in rows:
+        row["speedup"] = round(row["pages_per_second"] / baseline, 2)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark page-sharded PDF text extraction")
+    parser.add_argument("--pdf", help="PDF to extract (default: a generated PDF of --pages pages)")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", default=",".join(str(count) for count in (1, 2, 4, 8)), help="Comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            from loadtest.run import build_pdf
+            pdf_path = os.path.join(temp_dir, f"benchmark_{args.pages}_pages.pdf")
+            with open(pdf_path, "wb") as file_obj:
+                file_obj.write(build_pdf(args.pages))
+        rows = run_benchmark(pdf_path, worker_counts, args.repeat)
+
+    print(f"{'workers':>8} {'seconds':>9} {'pages/sec':>10} {'speedup':>8}   (cpu_count={os.cpu_count()})")
+    for row in rows:
+        print(f"{row['workers']:>8} {row['seconds']:>9.3f} {row['pages_per_second']:>10.1f} {row['speedup']:>7.2f}x")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"pdf_extraction_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, "w") as file_obj:
+        json.dump({"pdf": args.pdf or f"generated ({args.pages} pages)", "cpu_count": os.cpu_count(), "results": rows}, file_obj, indent=2)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
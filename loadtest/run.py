@@ -0,0 +1,302 @@
+"""
+Open-loop load test for the FastAPI service.
+
+    python -m loadtest.run loadtest/scenarios/mixed_upload_generate.json
+    python -m loadtest.run --compare loadtest/results/a.json loadtest/results/b.json
+
+Starts `loadtest.server` (main:app with stubbed backends) in a subprocess,
+drives the scenario's request mix at a fixed Poisson arrival rate regardless
+of how fast responses come back, and writes a JSON result file with throughput,
+latency percentiles, error rates and server-side event-loop lag.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SAMPLE_QUERIES = [
+    "What is the repo rate and how does it affect loans?",
+    "Explain the cash reserve ratio requirement for banks",
+    "How do mutual fund expense ratios work?",
+    "What are the KYC requirements for opening a bank account?",
+    "Difference between fixed deposits and recurring deposits",
+    "How does SEBI regulate insider trading?",
+    "What is the statutory liquidity ratio?",
+    "How is interest on a savings account calculated?",
+    "What is a systematic investment plan?",
+    "Explain the role of the monetary policy committee",
+]
+
+PAGE_TEXT = (
+    "The Reserve Bank of India uses the repo rate, reverse repo rate, cash reserve ratio and statutory "
+    "liquidity ratio as instruments of monetary policy. Banks must follow know-your-customer norms and "
+    "report suspicious transactions. Investors should compare expense ratios and risk profiles of funds. "
+)
+
+
+def _percentile(sorted_values: List[float], quantile: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, int(round(quantile * (len(sorted_values) - 1)))))
+    return sorted_values[rank]
+
+
+def build_pdf(pages: int) -> bytes:
+    import fitz
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"Page {page_number + 1}. " + PAGE_TEXT * 6, fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def build_txt(pages: int) -> bytes:
+    return ("\n\n".join(PAGE_TEXT * 6 for _ in range(pages))).encode("utf-8")
+
+
+def _multipart(fields: Dict[str, str], file_field: Optional[Tuple[str, str, str, bytes]] = None) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    if file_field:
+        name, filename, content_type, data = file_field
+        header = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'
+        parts.append(header.encode("utf-8") + data + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+async def http_request(host: str, port: int, method: str, path: str, body: bytes = b"", content_type: Optional[str] = None) -> Tuple[int, bytes]:
+    """Minimal HTTP/1.1 client (one connection per request) so the harness needs only the stdlib."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close", f"Content-Length: {len(body)}"]
+        if content_type:
+            headers.append(f"Content-Type: {content_type}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, payload
+
+
+class Workload:
+    """Weighted request mix; uploads are pre-built so generation time is not measured."""
+    def __init__(self, workload: List[Dict], seed: int):
+        self.random = random.Random(seed)
+        self.entries = workload
+        self.weights = [entry["weight"] for entry in workload]
+        self.files: Dict[int, bytes] = {}
+        for idx, entry in enumerate(workload):
+            if entry["operation"] == "upload":
+                pages = entry.get("pages", 10)
+                self.files[idx] = build_txt(pages) if entry.get("file_type") == "txt" else build_pdf(pages)
+
+
+    def next_request(self) -> Tuple[str, str, bytes, str]:
+        idx = self.random.choices(range(len(self.entries)), weights=self.weights)[0]
+        entry = self.entries[idx]
+        if entry["operation"] == "generate":
+            queries = SAMPLE_QUERIES[:entry.get("distinct_queries", len(SAMPLE_QUERIES))]
+            fields = {
+                "user_query": self.random.choice(queries),
+                "task_type": self.random.choice(entry.get("task_types", ["explain"]))
+            }
+            body, content_type = _multipart(fields)
+            return entry.get("label", "generate"), "/generate-content", body, content_type
+        file_type = entry.get("file_type", "pdf")
+        filename = f"loadtest_{uuid.uuid4().hex[:8]}.{file_type}"
+        fields = {}
+        if file_type == "pdf":
+            fields["pdf_processing_method"] = entry.get("pdf_processing_method", "standard text extraction")
+        mime_type = "application/pdf" if file_type == "pdf" else "text/plain"
+        body, content_type = _multipart(fields, ("file", filename, mime_type, self.files[idx]))
+        return entry.get("label", f"upload_{file_type}"), "/upload-file", body, content_type
+
+
+def summarize(records: List[Dict], duration: float) -> Dict:
+    latencies = sorted(record["latency_ms"] for record in records if record["outcome"] == "ok")
+    errors: Dict[str, int] = {}
+    for record in records:
+        if record["outcome"] != "ok":
+            errors[record["outcome"]] = errors.get(record["outcome"], 0) + 1
+    return {
+        "requests": len(records),
+        "ok": len(latencies),
+        "errors": errors,
+        "error_rate": (len(records) - len(latencies)) / len(records) if records else 0.0,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None
+        }
+    }
+
+
+async def drive(scenario: Dict, host: str, port: int) -> Dict:
+    workload = Workload(scenario["workload"], scenario.get("seed", 42))
+    arrival_random = random.Random(scenario.get("seed", 42) + 1)
+    rate = scenario["arrival_rate_per_second"]
+    duration = scenario["duration_seconds"]
+    timeout = scenario.get("client_timeout_seconds", 60)
+    records: List[Dict] = []
+
+    async def send(label: str, path: str, body: bytes, content_type: str, scheduled_at: float) -> None:
+        try:
+            status, _ = await asyncio.wait_for(http_request(host, port, "POST", path, body, content_type), timeout=timeout)
+            outcome = "ok" if status == 200 else f"http_{status}"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except OSError:
+            outcome = "connection_error"
+        # Open-loop latency is measured from the scheduled arrival, so queueing delay counts
+        records.append({"operation": label, "outcome": outcome, "latency_ms": (time.perf_counter() - scheduled_at) * 1000})
+
+    tasks = []
+    started_at = time.perf_counter()
+    next_arrival = started_at
+    while next_arrival - started_at < duration:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        label, path, body, content_type = workload.next_request()
+        tasks.append(asyncio.create_task(send(label, path, body, content_type, next_arrival)))
+        next_arrival += arrival_random.expovariate(rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+
+    by_operation = {}
+    for label in sorted({record["operation"] for record in records}):
+        by_operation[label] = summarize([record for record in records if record["operation"] == label], elapsed)
+    _, metrics_payload = await http_request(host, port, "GET", "/metrics")
+    server_metrics = json.loads(metrics_payload)
+    return {
+        "elapsed_seconds": elapsed,
+        "overall": summarize(records, elapsed),
+        "by_operation": by_operation,
+        "event_loop_lag_seconds": server_metrics.get("histograms", {}).get("event_loop.lag_seconds"),
+        "server_metrics": server_metrics
+    }
+
+
+def start_server(scenario: Dict, host: str, port: int) -> subprocess.Popen:
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "loadtest.server", "--host", host, "--port", str(port), "--stub-config", json.dumps(scenario.get("stubs", {}))]
+    process = subprocess.Popen(command, cwd=repo_root, env={**os.environ, **scenario.get("server_env", {})})
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Load-test server exited during startup")
+        try:
+            status, _ = asyncio.run(http_request(host, port, "GET", "/"))
+            if status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Load-test server did not become ready within 60 seconds")
+
+
+def run_scenario(path: str, host: str, port: int) -> str:
+    with open(path) as file_obj:
+        scenario = json.load(file_obj)
+    print(f"Running scenario '{scenario['name']}': {scenario['arrival_rate_per_second']} req/s for {scenario['duration_seconds']}s")
+    server = start_server(scenario, host, port)
+    try:
+        results = asyncio.run(drive(scenario, host, port))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    report = {
+        "scenario": scenario["name"],
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "config": scenario,
+        "results": results
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"{scenario['name']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, "w") as file_obj:
+        json.dump(report, file_obj, indent=2)
+    print_report(report)
+    print(f"Results saved to {output_path}")
+    return output_path
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def print_report(report: Dict) -> None:
+    results = report["results"]
+    print(f"\n{'operation':<24}{'requests':>9}{'ok':>7}{'err%':>7}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+    rows = [("overall", results["overall"])] + list(results["by_operation"].items())
+    for label, summary in rows:
+        latency = summary["latency_ms"]
+        print(f"{label:<24}{summary['requests']:>9}{summary['ok']:>7}{summary['error_rate'] * 100:>6.1f}%"
+              f"{summary['throughput_rps']:>8.2f}{_format_ms(latency['p50']):>8}{_format_ms(latency['p95']):>8}{_format_ms(latency['p99']):>8}")
+    lag = results.get("event_loop_lag_seconds")
+    if lag:
+        print(f"\nevent-loop lag: p50 {lag['p50'] * 1000:.1f} ms, p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms")
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    with open(baseline_path) as file_obj:
+        baseline = json.load(file_obj)["results"]
+    with open(candidate_path) as file_obj:
+        candidate = json.load(file_obj)["results"]
+    print(f"\n{'operation':<24}{'metric':<16}{'baseline':>12}{'candidate':>12}{'change':>10}")
+    labels = ["overall"] + sorted(set(baseline["by_operation"]) | set(candidate["by_operation"]))
+    for label in labels:
+        before = baseline["overall"] if label == "overall" else baseline["by_operation"].get(label)
+        after = candidate["overall"] if label == "overall" else candidate["by_operation"].get(label)
+        if not before or not after:
+            continue
+        metrics = [("throughput_rps", before["throughput_rps"], after["throughput_rps"]),
+                   ("error_rate", before["error_rate"], after["error_rate"])]
+        metrics += [(f"{quantile} ms", before["latency_ms"][quantile], after["latency_ms"][quantile]) for quantile in ("p50", "p95", "p99")]
+        for name, old, new in metrics:
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "-"
+            print(f"{label:<24}{name:<16}{_format_ms(old) if 'ms' in name else f'{old:.3f}':>12}"
+                  f"{_format_ms(new) if 'ms' in name else f'{new:.3f}':>12}{change:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test main:app with stubbed upstream services")
+    parser.add_argument("scenario", nargs="?", help="Path to a scenario JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.scenario:
+        run_scenario(args.scenario, args.host, args.port)
+    else:
+        parser.error("a scenario file or --compare is required")
+
+
+if __name__ == "__main__":
+    main()
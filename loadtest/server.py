@@ -0,0 +1,63 @@
+"""
+Start main:app in a single uvicorn worker with stubbed upstream services.
+
+    python -m loadtest.server --port 8765 --stub-config '{"llm": {"latency_ms": 2000}}'
+
+The server also samples event-loop lag and records it in the shared metrics
+registry, so it shows up in GET /metrics as `event_loop.lag_seconds`.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+
+from loadtest.stubs import install_stubs
+
+
+class LagMonitoredApp:
+    """ASGI wrapper that measures how late the event loop wakes up from a short sleep."""
+    def __init__(self, app, interval_seconds: float = 0.05):
+        self.app = app
+        self.interval_seconds = interval_seconds
+        self._task = None
+
+
+    async def _monitor(self) -> None:
+        from src.utils.metrics import metrics
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            lag = time.perf_counter() - started_at - self.interval_seconds
+            metrics.observe("event_loop.lag_seconds", max(0.0, lag))
+
+
+    async def __call__(self, scope, receive, send):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._monitor())
+        await self.app(scope, receive, send)
+
+
+def build_app(stub_config: dict):
+    # Config reads credentials at import time; stubs accept any value
+    for variable in ("EURIAI_API_KEY", "PINECONE_API_KEY", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        os.environ.setdefault(variable, "loadtest")
+    install_stubs(stub_config)
+    import main
+    return LagMonitoredApp(main.app)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run main:app with stubbed Euriai, Pinecone, S3 and EasyOCR")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stub-config", default="{}", help="JSON object with per-service latency/error settings")
+    args = parser.parse_args()
+
+    import uvicorn
+    app = build_app(json.loads(args.stub_config))
+    uvicorn.run(app, host=args.host, port=args.port, workers=1, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Local stand-ins for the external services used by the FastAPI app
+(Euriai chat/embeddings, Pinecone, S3 via boto3 and EasyOCR).
+
+Each stand-in sleeps for a configurable latency and fails at a configurable
+rate, so the load-test server exercises the real request path of main:app
+without calling any upstream provider. Call install_stubs() before importing main.
+"""
+import io
+import sys
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timezone
+from types import ModuleType, SimpleNamespace
+from typing import Dict, List, Optional
+
+
+DEFAULT_STUB_CONFIG = {
+    "llm": {"latency_ms": 1500, "jitter_ms": 500, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "embeddings": {"latency_ms": 120, "jitter_ms": 40, "error_rate": 0.0},
+    "pinecone": {"latency_ms": 40, "jitter_ms": 10, "error_rate": 0.0},
+    "s3": {"latency_ms": 80, "jitter_ms": 20, "error_rate": 0.0},
+    "ocr": {"latency_ms_per_page": 400, "jitter_ms": 100, "error_rate": 0.0},
+}
+
+EMBEDDING_DIMENSION = 64
+
+
+class StubUpstreamError(Exception):
+    """Error raised by a stand-in, carrying an HTTP-like status code."""
+    def __init__(self, message: str, status_code: int = 500, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class _Behaviour:
+    def __init__(self, settings: Dict):
+        self.settings = settings
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+
+    def delay(self, multiplier: float = 1.0, key: str = "latency_ms") -> None:
+        with self._lock:
+            jitter = self._random.uniform(-1, 1) * self.settings.get("jitter_ms", 0)
+        time.sleep(max(0.0, self.settings.get(key, 0) + jitter) * multiplier / 1000.0)
+
+
+    def maybe_fail(self, service: str) -> None:
+        with self._lock:
+            roll = self._random.random()
+        rate_limit_rate = self.settings.get("rate_limit_rate", 0.0)
+        if roll < rate_limit_rate:
+            raise StubUpstreamError(f"{service}: 429 Too Many Requests", status_code=429, retry_after=1)
+        if roll < rate_limit_rate + self.settings.get("error_rate", 0.0):
+            raise StubUpstreamError(f"{service}: 500 Internal Server Error", status_code=500)
+
+
+def _embed(text: str) -> List[float]:
+    # Deterministic bag-of-words hashing so similar texts get similar vectors
+    vector = [0.0] * EMBEDDING_DIMENSION
+    for word in text.lower().split():
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[digest[0] % EMBEDDING_DIMENSION] += 1.0
+    return vector if any(vector) else [1.0] + [0.0] * (EMBEDDING_DIMENSION - 1)
+
+
+def _fake_completion(model: str, prompt: str) -> str:
+    if "Generate the quiz questions below" in prompt:
+        questions = []
+        for number in range(1, 4):
+            questions.append(
+                f"Q{number}. Which statement about the repo rate is correct ({model})?\n"
+                "A) It is set by commercial banks\n"
+                "B) It is the rate at which the central bank lends to banks\n"
+                "C) It applies only to savings accounts\n"
+                "D) It is fixed by law\n"
+                "Correct Answer: B"
+            )
+        return "\n\n".join(questions)
+    return (
+        f"## Overview\n\nThis is a stubbed response from {model}.\n\n"
+        "- The repo rate is the rate at which the central bank lends to commercial banks.\n"
+        "- Changes in the repo rate influence lending and deposit rates.\n"
+    )
+
+
+def install_stubs(config: Optional[Dict] = None) -> Dict:
+    """Register stand-in modules in sys.modules; returns the effective configuration."""
+    effective = {service: dict(settings) for service, settings in DEFAULT_STUB_CONFIG.items()}
+    for service, settings in (config or {}).items():
+        effective.setdefault(service, {}).update(settings)
+    behaviours = {service: _Behaviour(settings) for service, settings in effective.items()}
+
+    # --- Euriai (chat models and embeddings) ---
+    class _ChatModel:
+        def __init__(self, api_key=None, model=None, temperature=None):
+            self.model = model
+
+        def invoke(self, prompt: str):
+            behaviours["llm"].delay()
+            behaviours["llm"].maybe_fail(f"euriai/{self.model}")
+            content = _fake_completion(self.model, prompt)
+            return SimpleNamespace(content=content, usage_metadata={"total_tokens": (len(prompt) + len(content)) // 4})
+
+    class _Embeddings:
+        def __init__(self, api_key=None, model=None):
+            self.model = model
+
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            # One upstream round trip per batch call
+            behaviours["embeddings"].delay()
+            behaviours["embeddings"].maybe_fail("euriai/embeddings")
+            return [_embed(text) for text in texts]
+
+        def embed_query(self, text: str) -> List[float]:
+            behaviours["embeddings"].delay()
+            behaviours["embeddings"].maybe_fail("euriai/embeddings")
+            return _embed(text)
+
+    euriai_module = ModuleType("euriai")
+    euriai_langchain = ModuleType("euriai.langchain")
+    euriai_langchain.create_chat_model = lambda api_key=None, model=None, temperature=None, **kwargs: _ChatModel(api_key, model, temperature)
+    euriai_langchain.EuriaiEmbeddings = _Embeddings
+    euriai_module.langchain = euriai_langchain
+
+    # --- Pinecone, backed by the in-memory LocalVectorIndex ---
+    from src.components.local_vector_index import LocalVectorIndex
+
+    class _Index:
+        def __init__(self, name: str):
+            self.name = name
+            self._index = LocalVectorIndex()
+
+        def _call(self):
+            behaviours["pinecone"].delay()
+            behaviours["pinecone"].maybe_fail(f"pinecone/{self.name}")
+
+        def upsert(self, vectors, namespace: str = ""):
+            self._call()
+            return self._index.upsert(vectors=vectors, namespace=namespace)
+
+        def query(self, vector, top_k=5, filter=None, include_metadata=False, namespace: str = ""):
+            self._call()
+            return self._index.query(vector=vector, top_k=top_k, filter=filter, include_metadata=include_metadata, namespace=namespace)
+
+        def fetch(self, ids, namespace: str = ""):
+            self._call()
+            return self._index.fetch(ids=ids, namespace=namespace)
+
+        def delete(self, ids, namespace: str = ""):
+            self._call()
+            return self._index.delete(ids=ids, namespace=namespace)
+
+    indexes: Dict[str, _Index] = {}
+
+    class _Pinecone:
+        def __init__(self, api_key=None, **kwargs):
+            pass
+
+        def Index(self, name: str):
+            if name not in indexes:
+                indexes[name] = _Index(name)
+            return indexes[name]
+
+    pinecone_module = ModuleType("pinecone")
+    pinecone_module.Pinecone = _Pinecone
+
+    # --- S3 via boto3 ---
+    objects: Dict[str, bytes] = {}
+    object_metadata: Dict[str, Dict[str, str]] = {}
+    last_modified: Dict[str, datetime] = {}
+
+    class _ClientError(Exception):
+        pass
+
+    class _S3Client:
+        def _call(self):
+            behaviours["s3"].delay()
+            try:
+                behaviours["s3"].maybe_fail("s3")
+            except StubUpstreamError as e:
+                raise _ClientError(str(e))
+
+        def upload_file(self, file_path, bucket, key, ExtraArgs=None):
+            self._call()
+            with open(file_path, "rb") as file_obj:
+                objects[f"{bucket}/{key}"] = file_obj.read()
+            object_metadata[f"{bucket}/{key}"] = (ExtraArgs or {}).get("Metadata", {})
+            last_modified[f"{bucket}/{key}"] = datetime.now(timezone.utc)
+
+        def get_object(self, Bucket, Key):
+            self._call()
+            body = objects.get(f"{Bucket}/{Key}")
+            if body is None:
+                raise _ClientError(f"NoSuchKey: {Key}")
+            return {"Body": io.BytesIO(body), "ContentLength": len(body), "Metadata": object_metadata.get(f"{Bucket}/{Key}", {})}
+
+        def put_object(self, Bucket, Key, Body, **kwargs):
+            self._call()
+            objects[f"{Bucket}/{Key}"] = Body
+            last_modified[f"{Bucket}/{Key}"] = datetime.now(timezone.utc)
+
+        def get_paginator(self, operation):
+            client = self
+
+            class _Paginator:
+                def paginate(self, Bucket, Prefix=""):
+                    client._call()
+                    keys = sorted(key.split("/", 1)[1] for key in objects if key.startswith(f"{Bucket}/{Prefix}"))
+                    for start in range(0, len(keys), 1000):
+                        yield {"Contents": [
+                            {"Key": key, "Size": len(objects[f"{Bucket}/{key}"]), "LastModified": last_modified[f"{Bucket}/{key}"]}
+                            for key in keys[start:start + 1000]
+                        ]}
+
+            return _Paginator()
+
+    boto3_module = ModuleType("boto3")
+    boto3_module.client = lambda service, **kwargs: _S3Client()
+    botocore_module = ModuleType("botocore")
+    botocore_exceptions = ModuleType("botocore.exceptions")
+    botocore_exceptions.ClientError = _ClientError
+    botocore_module.exceptions = botocore_exceptions
+
+    # --- EasyOCR ---
+    class _Reader:
+        def __init__(self, languages=None, gpu=False, **kwargs):
+            pass
+
+        def readtext(self, image_path, detail=0):
+            behaviours["ocr"].delay(key="latency_ms_per_page")
+            behaviours["ocr"].maybe_fail("easyocr")
+            return ["Stub OCR text for the repo rate, reverse repo rate and cash reserve ratio."]
+
+    easyocr_module = ModuleType("easyocr")
+    easyocr_module.Reader = _Reader
+
+    sys.modules.update({
+        "euriai": euriai_module,
+        "euriai.langchain": euriai_langchain,
+        "pinecone": pinecone_module,
+        "boto3": boto3_module,
+        "botocore": botocore_module,
+        "botocore.exceptions": botocore_exceptions,
+        "easyocr": easyocr_module,
+    })
+    return effective
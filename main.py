@@ -1,8 +1,12 @@
 import os
+import json
+import math
+import time
+import asyncio
 import tempfile
 import shutil
-from typing import Optional
-from fastapi import FastAPI, UploadFile, File, Form
+from typing import Any, Awaitable, Optional
+from fastapi import FastAPI, Request, UploadFile, File, Form, BackgroundTasks
 from fastapi.responses import JSONResponse
 
 from src.components.input_handler import UserInputHandler
@@ -10,6 +14,12 @@ from src.components.S3_storage_service import S3Storage
 from src.components.vector_db_client import VectorDBClient
 from src.components.rag_engine import RAGEngine
 from src.components.generative_ai import GenerativeAI
+from src.components.request_coalescer import RequestCoalescer
+from src.components.summary_tree_builder import SummaryTreeBuilder
+from src.components.llm_scheduler import LLMRateLimitError
+from src.config import Config
+from src.utils.deadline import Deadline, DeadlineExceeded, RequestCancelled
+from src.utils.metrics import metrics
 from src.logger import logging
 from src.exception import CustomException
 
@@ -20,6 +30,8 @@ s3_storage_service = S3Storage()
 vector_db_client = VectorDBClient()
 rag_engine = RAGEngine()
 generative_ai = GenerativeAI()
+summary_tree_builder = SummaryTreeBuilder(vector_db_client=vector_db_client, generative_ai=generative_ai)
+generate_coalescer = RequestCoalescer(name="generate")
 
 app = FastAPI()
 
@@ -30,10 +42,83 @@ async def root() -> JSONResponse:
     return JSONResponse(status_code=200, content={"message": "FinEduGuide API is running"})
 
 
+@app.get("/metrics")
+async def get_metrics() -> JSONResponse:
+    """Snapshot of in-process service metrics"""
+    return JSONResponse(status_code=200, content=metrics.snapshot())
+
+
+def request_deadline(request: Request) -> Deadline:
+    """Deadline from the client's timeout header (seconds), or the configured default"""
+    budget = Config.REQUEST_DEADLINE_SECONDS
+    header = request.headers.get(Config.REQUEST_DEADLINE_HEADER)
+    if header:
+        try:
+            budget = float(header)
+            if not math.isfinite(budget):
+                raise ValueError(header)
+        except ValueError:
+            logging.warning(f"Ignoring invalid {Config.REQUEST_DEADLINE_HEADER} header: {header}")
+            budget = Config.REQUEST_DEADLINE_SECONDS
+    budget = min(budget, Config.REQUEST_DEADLINE_MAX_SECONDS)
+    return Deadline(budget - Config.DEADLINE_SAFETY_MARGIN_SECONDS)
+
+
+def expected_latency(endpoint: str) -> float:
+    """Budget a request needs to have a fair chance of finishing, from recent completions"""
+    latency_metric = f"requests.{endpoint}.latency_seconds"
+    if metrics.count(latency_metric) < Config.DEADLINE_SHED_MIN_SAMPLES:
+        return Config.DEADLINE_MIN_BUDGET_SECONDS
+    return max(Config.DEADLINE_MIN_BUDGET_SECONDS, metrics.percentile(latency_metric, Config.DEADLINE_SHED_QUANTILE))
+
+
+async def await_with_deadline(request: Request, deadline: Deadline, work: Awaitable, stage: str) -> Any:
+    """
+    Await work running in a worker thread while watching the client.
+    A disconnect cancels the deadline, so the worker stops at its next check;
+    RequestCancelled or DeadlineExceeded is raised as soon as either happens.
+    """
+    task = asyncio.ensure_future(work)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=max(0.0, min(Config.DISCONNECT_POLL_SECONDS, deadline.remaining())))
+        if done:
+            # Work stopped by the deadline surfaces as such, not as a processing failure
+            if task.exception() is not None and deadline.done:
+                deadline.check(stage)
+            return task.result()
+        if await request.is_disconnected():
+            deadline.cancel("client disconnected")
+        if deadline.done:
+            task.cancel()
+            deadline.check(stage)
+
+
+def cancelled_response(endpoint: str, deadline: Deadline) -> JSONResponse:
+    """Response for work stopped by a client disconnect or an exhausted deadline"""
+    if deadline.cancelled:
+        logging.info(f"{endpoint} request cancelled: {deadline.reason}")
+        metrics.increment(f"requests.{endpoint}.cancelled")
+        # Nobody is listening any more; 499 mirrors nginx's "client closed request"
+        return JSONResponse(status_code=499, content={"error": "Client closed request"})
+    logging.warning(f"{endpoint} request exceeded its deadline")
+    metrics.increment(f"requests.{endpoint}.deadline_exceeded")
+    return JSONResponse(status_code=504, content={"error": "The request could not be completed within its timeout."})
+
+
+def shed_response(endpoint: str, deadline: Deadline) -> JSONResponse:
+    logging.warning(f"Shedding {endpoint} request with {deadline.remaining():.2f}s budget")
+    metrics.increment(f"requests.{endpoint}.shed")
+    return JSONResponse(status_code=503, content={"error": "The server is too busy to complete this request within its timeout. Please try again shortly."})
+
+
 @app.post("/upload-file")
 async def upload_document(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    pdf_processing_method: Optional[str] = Form(None)
+    pdf_processing_method: Optional[str] = Form(None),
+    build_summary_tree: Optional[bool] = Form(None),
+    collection: Optional[str] = Form(None)
 ) -> JSONResponse:
     """
     Upload a document (PDF or TXT)
@@ -43,8 +128,16 @@ async def upload_document(
         pdf_processing_method: PDF processing method
             - "standard text extraction"
             - "ocr based extraction"
+        build_summary_tree: Build hierarchical document summaries in the background
+            after the embeddings are stored. Defaults to Config.SUMMARY_TREE_ENABLED.
+        collection: Optional collection/tenant name; each collection is stored in its own namespace.
+
+    The client's timeout is read from the X-Request-Timeout header; processing stops
+    when it runs out or the client disconnects.
     """
     logging.info(f"Received file upload request: {file.filename}")
+    deadline = request_deadline(request)
+    started_at = time.monotonic()
     # Validate file type
     if file.content_type not in ("application/pdf", "text/plain"):
         logging.error(f"Unsupported file type: {file.content_type}")
@@ -62,6 +155,23 @@ async def upload_document(
             logging.error(f"Invalid PDF processing method: {PDF_Processing_Method}")
             return JSONResponse(status_code=400, content={"error": "Invalid PDF processing method. Use 'standard text extraction' or 'ocr based extraction'."})
     
+    if build_summary_tree is None:
+        build_summary_tree = Config.SUMMARY_TREE_ENABLED
+
+    # Resolve collection namespace
+    try:
+        namespace = vector_db_client.namespace_for(collection)
+    except ValueError as e:
+        logging.error(f"Invalid collection: {str(e)}")
+        return JSONResponse(status_code=400, content={"error": "Invalid collection name."})
+
+    try:
+        deadline.require(Config.DEADLINE_MIN_BUDGET_SECONDS, "upload")
+    except DeadlineExceeded:
+        return shed_response("upload", deadline)
+
+    uploaded_at = int(time.time())
+
     # Save file to temporary directory
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -74,7 +184,9 @@ async def upload_document(
             # Process file
             try:
                 logging.debug(f"Processing file: {file.filename}")
-                documents = input_handler.process_file(temp_file_path, PDF_Processing_Method=PDF_Processing_Method)
+                documents = await await_with_deadline(request, deadline, asyncio.to_thread(
+                    input_handler.process_file, temp_file_path, PDF_Processing_Method=PDF_Processing_Method, collection=collection, deadline=deadline, uploaded_at=uploaded_at
+                ), "file_processing")
                 logging.debug(f"File processed successfully: {file.filename}")
             except CustomException as e:
                 logging.error(f"File processing failed: {str(e)}")
@@ -83,7 +195,11 @@ async def upload_document(
             # Upload file to S3
             try:
                 logging.debug(f"Uploading {file.filename} to S3")
-                s3_storage_service.upload_file(temp_file_path, file.filename)   
+                # Collection and upload time are kept as object metadata for the bulk re-index
+                object_metadata = {"uploaded_at": str(uploaded_at), **({"collection": collection} if collection else {})}
+                await await_with_deadline(request, deadline, asyncio.to_thread(
+                    s3_storage_service.upload_file, temp_file_path, S3Storage.archive_key(file.filename, namespace), metadata=object_metadata
+                ), "s3_upload")
                 logging.debug(f"File uploaded to S3: {file.filename}")
             except CustomException as e:
                 logging.error(f"S3 upload failed: {str(e)}")
@@ -92,23 +208,45 @@ async def upload_document(
             # Store embeddings in Vector DB
             try:
                 logging.debug(f"Storing embeddings for {file.filename}")
-                stored = vector_db_client.store_embeddings(documents)
+                stored = await await_with_deadline(request, deadline, asyncio.to_thread(
+                    vector_db_client.store_embeddings, documents, namespace=namespace, deadline=deadline
+                ), "embeddings")
                 if stored:
                     logging.debug(f"Embeddings stored successfully for {file.filename}")
+                    # Summary tree is built after the response is sent
+                    if build_summary_tree:
+                        background_tasks.add_task(build_document_summary_tree, documents, namespace)
             except CustomException as e:
                 logging.error(f"Vector DB storage failed: {str(e)}")
                 return JSONResponse(status_code=500, content={"error": "Failed to store document embeddings"})
+    except (RequestCancelled, DeadlineExceeded):
+        return cancelled_response("upload", deadline)
     except Exception as e:
         logging.error("Unexpected error during upload flow")
         return JSONResponse(status_code=500, content={"error": "Unexpected error occurred during file upload"})
     logging.info(f"File upload and processing completed: {file.filename}")
+    metrics.increment("requests.upload.completed")
+    metrics.observe("requests.upload.latency_seconds", time.monotonic() - started_at)
     return JSONResponse(status_code=200, content={"message": "File uploaded and processed successfully"})
 
 
+def build_document_summary_tree(documents, namespace: str) -> None:
+    """Background task building the hierarchical summary tree of an uploaded document"""
+    try:
+        summary_tree_builder.build_tree(documents, namespace=namespace)
+    except CustomException as e:
+        logging.error(f"Summary tree building failed: {str(e)}")
+
+
 @app.post("/generate-content")
 async def generate_content(
+    request: Request,
     user_query: str = Form(...),
-    task_type: str = Form(...)
+    task_type: str = Form(...),
+    collection: Optional[str] = Form(None),
+    source: Optional[str] = Form(None),
+    date_from: Optional[str] = Form(None),
+    date_to: Optional[str] = Form(None)
 ) -> JSONResponse:
     """
     Generate content based on user question and task type.
@@ -119,8 +257,17 @@ async def generate_content(
             - "Explain"
             - "Quiz"
             - "Summary"
+        collection: Optional collection/tenant to search instead of the default namespace.
+        source: Optional source filename to restrict retrieval to.
+        date_from: Optional earliest upload date (YYYY-MM-DD), inclusive.
+        date_to: Optional latest upload date (YYYY-MM-DD), inclusive.
+
+    The client's timeout is read from the X-Request-Timeout header; requests that
+    cannot finish in time are shed, and generation stops if the client disconnects.
     """
     logging.info(f"Received content generation request. Task: {task_type}")
+    deadline = request_deadline(request)
+    started_at = time.monotonic()
     # Validate task type
     valid_tasks = ("explain", "quiz", "summary")
     task_type = task_type.strip().lower()
@@ -133,23 +280,59 @@ async def generate_content(
     except CustomException as e:
         logging.error(f"User query parsing failed: {str(e)}")
         return JSONResponse(status_code=400, content={"error": "Query too short. Please provide a more detailed query."})
+
+    # Resolve retrieval scope; filters are pushed down into the index query
+    try:
+        namespace = vector_db_client.namespace_for(collection)
+        metadata_filter = rag_engine.build_metadata_filter(source=source, date_from=date_from, date_to=date_to)
+    except (ValueError, CustomException) as e:
+        logging.error(f"Invalid retrieval scope: {str(e)}")
+        return JSONResponse(status_code=400, content={"error": "Invalid collection, source or date filter. Dates must be YYYY-MM-DD."})
+
+    # Shed requests whose budget is below the typical generation latency
+    try:
+        deadline.require(expected_latency("generate"), "generate")
+    except DeadlineExceeded:
+        return shed_response("generate", deadline)
     
     try:
-        # Retrieve context using RAG Engine
-        context = rag_engine.retrieve_context(user_query, top_k=5, relevance_threshold=0.5)
-        # Assemble prompt
-        prompt = rag_engine.assemble_prompt(context, user_query, content_type=task_type)
-        # Generate content using Generative AI
-        if task_type == "explain":
-            generated_content = generative_ai.generate_content(prompt)
-            logging.info("Content generated successfully")
-        elif task_type == "quiz":
-            generated_content = generative_ai.generate_quiz(prompt)
-            logging.info("Quiz generated successfully")
-        elif task_type == "summary":
-            generated_content = generative_ai.generate_summary(prompt)
-            logging.info("Summary generated successfully")
+        # Identical concurrent requests share a single retrieval + LLM call
+        key = RequestCoalescer.make_key(task_type, user_query, namespace, json.dumps(metadata_filter, sort_keys=True))
+        generated_content = await await_with_deadline(request, deadline, generate_coalescer.run(
+            key, run_generation, user_query, task_type, metadata_filter, namespace, deadline=deadline
+        ), "generate")
+        metrics.increment("requests.generate.completed")
+        metrics.observe("requests.generate.latency_seconds", time.monotonic() - started_at)
         return JSONResponse(status_code=200, content=generated_content)
+    except (RequestCancelled, DeadlineExceeded):
+        return cancelled_response("generate", deadline)
     except CustomException as e:
         logging.error(f"Content generation failed: {str(e)}")
-        return JSONResponse(status_code=500, content={"error": "Failed to generate content"})
\ No newline at end of file
+        # Upstream model still rate limited after scheduler retries
+        if isinstance(e.__context__, LLMRateLimitError):
+            retry_after = e.__context__.retry_after
+            headers = {"Retry-After": str(int(retry_after) + 1)} if retry_after else None
+            return JSONResponse(status_code=503, headers=headers, content={"error": "The AI model is busy right now. Please try again shortly."})
+        return JSONResponse(status_code=500, content={"error": "Failed to generate content"})
+
+
+def run_generation(user_query: str, task_type: str, metadata_filter: Optional[dict] = None, namespace: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+    """Blocking retrieval + generation pipeline, executed in a worker thread"""
+    # Retrieve context using RAG Engine; summaries prefer precomputed summary nodes
+    if task_type == "summary":
+        context = rag_engine.retrieve_summary_context(user_query, top_k=5, relevance_threshold=0.5, metadata_filter=metadata_filter, namespace=namespace, deadline=deadline)
+    else:
+        context = rag_engine.retrieve_context(user_query, top_k=5, relevance_threshold=0.5, metadata_filter=metadata_filter, namespace=namespace, deadline=deadline)
+    # Assemble prompt
+    prompt = rag_engine.assemble_prompt(context, user_query, content_type=task_type)
+    # Generate content using Generative AI
+    if task_type == "explain":
+        generated_content = generative_ai.generate_content(prompt, deadline=deadline)
+        logging.info("Content generated successfully")
+    elif task_type == "quiz":
+        generated_content = generative_ai.generate_quiz(prompt, deadline=deadline)
+        logging.info("Quiz generated successfully")
+    elif task_type == "summary":
+        generated_content = generative_ai.generate_summary(prompt, deadline=deadline)
+        logging.info("Summary generated successfully")
+    return generated_content
@@ -1,5 +1,8 @@
 import sys
+import json
+import shutil
 import boto3
+from typing import Dict, Iterator, Optional
 from botocore.exceptions import ClientError
 
 from src.config import Config
@@ -24,10 +27,29 @@ class S3Storage:
             raise CustomException(e, sys)
 
 
-    def upload_file(self, file_path, filename):
+    @staticmethod
+    def archive_key(filename: str, namespace: Optional[str] = None) -> str:
+        """Object key for an uploaded document; collections get their own prefix so equal filenames don't overwrite each other."""
+        if not namespace:
+            return filename
+        return f"{Config.S3_COLLECTIONS_PREFIX}/{namespace}/{filename}"
+
+
+    @staticmethod
+    def namespace_from_key(key: str) -> Optional[str]:
+        """Collection namespace encoded in an archive key, or None for unscoped uploads."""
+        parts = key.split("/")
+        if len(parts) == 3 and parts[0] == Config.S3_COLLECTIONS_PREFIX and parts[1]:
+            return parts[1]
+        return None
+
+
+    def upload_file(self, file_path, filename, metadata: Optional[Dict[str, str]] = None):
         try:
             logging.info(f"Uploading file {filename} to S3 bucket {self.bucket}")
-            self.s3.upload_file(file_path, self.bucket, filename)
+            # Object metadata (e.g. collection) lets a bulk re-index restore document scope
+            extra_args = {"Metadata": metadata} if metadata else None
+            self.s3.upload_file(file_path, self.bucket, filename, ExtraArgs=extra_args)
             logging.info(f"File {filename} uploaded successfully")
             return True
         except ClientError as e:
@@ -43,4 +65,49 @@ class S3Storage:
             return file_obj
         except ClientError as e:
             logging.error(f"Error retrieving file: {e}")
+            raise CustomException(e, sys)
+
+
+    def list_files(self, prefix: str = "") -> Iterator[Dict]:
+        """Yield {"Key", "Size", "LastModified"} for every object under prefix, page by page."""
+        try:
+            logging.info(f"Listing files in S3 bucket {self.bucket} with prefix '{prefix}'")
+            paginator = self.s3.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for item in page.get("Contents", []):
+                    yield item
+        except ClientError as e:
+            logging.error(f"Error listing files: {e}")
+            raise CustomException(e, sys)
+
+
+    def download_file(self, filename, file_path) -> Dict[str, str]:
+        """Stream an object to file_path and return its user metadata."""
+        file_obj = self.get_file(filename)
+        try:
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file_obj["Body"], buffer, length=1024 * 1024)
+            return file_obj.get("Metadata", {})
+        except Exception as e:
+            logging.error(f"Error downloading file {filename}: {e}")
+            raise CustomException(e, sys)
+
+
+    def read_json(self, key) -> Dict:
+        file_obj = self.get_file(key)
+        try:
+            return json.loads(file_obj["Body"].read())
+        except Exception as e:
+            logging.error(f"Error reading JSON object {key}: {e}")
+            raise CustomException(e, sys)
+
+
+    def write_json(self, key, data: Dict) -> bool:
+        try:
+            logging.info(f"Writing JSON object {key} to S3 bucket {self.bucket}")
+            # A single PUT replaces the object atomically for readers
+            self.s3.put_object(Bucket=self.bucket, Key=key, Body=json.dumps(data).encode("utf-8"), ContentType="application/json")
+            return True
+        except ClientError as e:
+            logging.error(f"Error writing JSON object {key}: {e}")
             raise CustomException(e, sys)
\ No newline at end of file
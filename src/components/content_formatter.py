@@ -1,7 +1,11 @@
 import sys
-from euriai.langchain import create_chat_model
+import time
+from typing import Dict
 
 from src.config import Config
+from src.components.llm_scheduler import get_llm_scheduler
+from src.utils.local_formatter import LocalFormatter, QuizParseError
+from src.utils.metrics import metrics
 from src.logger import logging
 from src.exception import CustomException
 
@@ -11,42 +15,105 @@ class ContentFormatter:
     def __init__(self):
         try:
             logging.info("Initializing ContentFormatter component")
-            self.format_model = create_chat_model(
-                api_key=Config.EURIAI_API_KEY,
-                model=Config.LLaMA_4_SCOUT_MODEL,
-                temperature=Config.TEMPERATURE
-            )
+            # Formatting calls share the rate-limit-aware scheduler with GenerativeAI
+            self.scheduler = get_llm_scheduler()
+            self.format_model = Config.LLaMA_4_SCOUT_MODEL
+            # Deterministic local formatting; the LLM is only a fallback
+            self.local_formatter = LocalFormatter()
             logging.info("ContentFormatter component initialized successfully")
         except Exception as e:
             logging.error(f"Error initializing ContentFormatter model: {str(e)}")
             raise CustomException(e, sys)
 
 
+    def _invoke_format_model(self, prompt: str) -> str:
+        started_at = time.monotonic()
+        response = self.scheduler.invoke(self.format_model, prompt)
+        metrics.observe("formatter.llm.latency_seconds", time.monotonic() - started_at)
+        return response
+
+
+    def _record_local(self, kind: str, started_at: float, success: bool) -> None:
+        metrics.observe("formatter.local.latency_seconds", time.monotonic() - started_at)
+        metrics.increment(f"formatter.{kind}.{'parse_success' if success else 'parse_failure'}")
+        successes = metrics.counter(f"formatter.{kind}.parse_success")
+        failures = metrics.counter(f"formatter.{kind}.parse_failure")
+        metrics.set_gauge(f"formatter.{kind}.parse_success_rate", successes / (successes + failures))
+        if success:
+            # Credit the LLM round trip that was avoided, using its observed mean latency
+            llm_latency = metrics.mean("formatter.llm.latency_seconds", default=Config.FORMATTER_LLM_LATENCY_ESTIMATE_SECONDS)
+            metrics.increment("formatter.saved_latency_seconds", max(0.0, llm_latency - (time.monotonic() - started_at)))
+
+
     def format_content(self, content: str) -> str:
+        """Normalize explanation/summary markdown locally, falling back to the LLM on failure."""
+        if not content.strip():
+            return ""
+        started_at = time.monotonic()
+        try:
+            formatted = self.local_formatter.normalize_markdown(content)
+            if formatted:
+                self._record_local("content", started_at, success=True)
+                return formatted
+        except CustomException as e:
+            logging.warning(f"Local content formatting failed, falling back to LLM: {str(e)}")
+        self._record_local("content", started_at, success=False)
+        return self._llm_format_content(content)
+
+
+    def format_quiz(self, quiz: str) -> str:
+        """Render a quiz as markdown, parsing it locally and using the LLM only if parsing fails."""
+        return self.format_quiz_structured(quiz)["markdown"]
+
+
+    def format_quiz_structured(self, quiz: str) -> Dict:
+        """
+        Parse a quiz into {"questions": [{"number", "question", "options", "answer"}], "markdown": str}.
+        Falls back to LLM formatting when the quiz does not follow the expected layout.
+        """
+        started_at = time.monotonic()
+        try:
+            questions = self.local_formatter.parse_quiz(quiz)
+            self._record_local("quiz", started_at, success=True)
+            return {"questions": questions, "markdown": self.local_formatter.render_quiz_markdown(questions)}
+        except QuizParseError as e:
+            if not self.local_formatter.looks_like_quiz(quiz):
+                # Refusals and "no relevant information" replies are plain text, not malformed quizzes
+                logging.info("Quiz response contains no questions, normalizing as plain text")
+                return {"questions": [], "markdown": self.format_content(quiz)}
+            logging.warning(f"Local quiz parsing failed, falling back to LLM: {str(e)}")
+            self._record_local("quiz", started_at, success=False)
+        formatted = self._llm_format_quiz(quiz)
+        try:
+            questions = self.local_formatter.parse_quiz(formatted)
+            return {"questions": questions, "markdown": self.local_formatter.render_quiz_markdown(questions)}
+        except QuizParseError:
+            return {"questions": [], "markdown": formatted}
+
+
+    def _llm_format_content(self, content: str) -> str:
         try:
             logging.info("Formatting content using LLaMA 4 Scout model")
-            format_model = self.format_model
             prompt = f"""Please format the following content appropriately to enhance readability and engagement.
             note: Do not start your answer like this 'Here is the reformatted content...':
             \n\n{content}"""
-            response = format_model.invoke(prompt)
+            response = self._invoke_format_model(prompt)
             logging.info("Content formatted successfully")
-            return response.content
+            return response
         except Exception as e:
             logging.error(f"Error occurred while formatting content: {str(e)}")
             raise CustomException(e, sys)
 
 
-    def format_quiz(self, quiz: str) -> str:
+    def _llm_format_quiz(self, quiz: str) -> str:
         try:
             logging.info("Formatting quiz using LLaMA 4 Scout model")
-            format_model = self.format_model
             prompt = f"""Please format the following quiz to make it more engaging and clear. 
             note: Do not start your answer like this 'Here is the reformatted quiz to make it more engaging and clear...':
             \n\n{quiz}"""
-            response = format_model.invoke(prompt)
+            response = self._invoke_format_model(prompt)
             logging.info("Quiz formatted successfully")
-            return response.content
+            return response
         except Exception as e:
             logging.error(f"Error occurred while formatting quiz: {str(e)}")
             raise CustomException(e, sys)
\ No newline at end of file
@@ -1,7 +1,10 @@
 import sys
-from euriai.langchain import create_chat_model
+from typing import Optional
 
 from src.config import Config
+from src.components.llm_scheduler import Priority
+from src.components.model_router import ModelRouter
+from src.utils.deadline import Deadline
 from src.logger import logging
 from src.exception import CustomException
 
@@ -14,52 +17,39 @@ class GenerativeAI:
         self.GPT_4_1_NANO_MODEL = Config.GPT_4_1_NANO_MODEL
         self.GEMINI_2_5_FLASH_MODEL = Config.GEMINI_2_5_FLASH_MODEL
         self.TEMPERATURE = Config.TEMPERATURE
+        # Task routing (primary, fallbacks, hedging) on top of the shared rate-limit-aware scheduler
+        self.router = ModelRouter()
         logging.info("GenerativeAI component initialized successfully")
 
 
-    def generate_content(self, prompt: str) -> str:
+    def generate_content(self, prompt: str, priority: Priority = Priority.INTERACTIVE, deadline: Optional[Deadline] = None) -> str:
         try:
-            logging.info("Generating content using LLaMA 4 Scout model")
-            explanation_model = create_chat_model(
-                api_key=self.api_key,
-                model=self.LLaMA_4_SCOUT_MODEL,
-                temperature=self.TEMPERATURE
-            )
-            response = explanation_model.invoke(prompt)
+            logging.info("Generating content using LLaMA 4 Scout model (with configured fallbacks)")
+            response = self.router.generate("explain", prompt, priority=priority, deadline=deadline)
             logging.info("Content generated successfully")
-            return response.content
+            return response
         except Exception as e:
             logging.error(f"Error generating content: {str(e)}")
             raise CustomException(e, sys)
 
 
-    def generate_quiz(self, prompt: str) -> str:
+    def generate_quiz(self, prompt: str, priority: Priority = Priority.INTERACTIVE, deadline: Optional[Deadline] = None) -> str:
         try:
-            logging.info("Generating quiz using GPT-4.1 Nano model")
-            quiz_model = create_chat_model(
-                api_key=self.api_key,
-                model=self.GPT_4_1_NANO_MODEL,
-                temperature=self.TEMPERATURE
-            )
-            response = quiz_model.invoke(prompt)
+            logging.info("Generating quiz using GPT-4.1 Nano model (with configured fallbacks)")
+            response = self.router.generate("quiz", prompt, priority=priority, deadline=deadline)
             logging.info("Quiz generated successfully")
-            return response.content
+            return response
         except Exception as e:
             logging.error(f"Error generating quiz: {str(e)}")
             raise CustomException(e, sys)
 
     
-    def generate_summary(self, prompt: str) -> str:
+    def generate_summary(self, prompt: str, priority: Priority = Priority.INTERACTIVE, deadline: Optional[Deadline] = None) -> str:
         try:
-            logging.info("Generating summary using Gemini 2.5 Flash model")
-            summary_model = create_chat_model(
-                api_key=self.api_key,
-                model=self.GEMINI_2_5_FLASH_MODEL,
-                temperature=self.TEMPERATURE
-            )
-            response = summary_model.invoke(prompt)
+            logging.info("Generating summary using Gemini 2.5 Flash model (with configured fallbacks)")
+            response = self.router.generate("summary", prompt, priority=priority, deadline=deadline)
             logging.info("Summary generated successfully")
-            return response.content
+            return response
         except Exception as e:
             logging.error(f"Error generating summary: {str(e)}")
             raise CustomException(e, sys)
\ No newline at end of file
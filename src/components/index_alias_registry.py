@@ -0,0 +1,90 @@
+import sys
+import time
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from src.config import Config
+from src.components.S3_storage_service import S3Storage
+from src.logger import logging
+from src.exception import CustomException
+
+
+class IndexAliasRegistry:
+    """
+    Maps logical namespaces (collections) to the physical index and namespace
+    currently serving them.
+
+    The mapping is a single JSON object in the S3 bucket
+    ({"index_name": ..., "namespaces": {logical: physical}}), so a bulk re-index
+    can build a fresh namespace and switch every reader over with one PUT.
+    Readers cache the mapping for Config.INDEX_ALIAS_TTL_SECONDS.
+    """
+    def __init__(self, s3_storage: Optional[S3Storage] = None):
+        try:
+            logging.info("Initializing IndexAliasRegistry")
+            self.s3_storage = s3_storage or S3Storage()
+            self.key = Config.INDEX_ALIAS_KEY
+            self.ttl_seconds = Config.INDEX_ALIAS_TTL_SECONDS
+            self._lock = threading.Lock()
+            self._aliases: Dict = {}
+            self._loaded_at = float("-inf")
+        except Exception as e:
+            logging.error(f"Error initializing IndexAliasRegistry: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    def load(self, force: bool = False) -> Dict:
+        with self._lock:
+            if not force and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._aliases
+            try:
+                self._aliases = self.s3_storage.read_json(self.key)
+            except CustomException:
+                # No alias object yet (or S3 unavailable): keep the last known mapping
+                logging.info("Index alias mapping not available, using last known mapping")
+            self._loaded_at = time.monotonic()
+            return self._aliases
+
+
+    def resolve(self, namespace: str) -> Tuple[str, str]:
+        """Return (index_name, physical_namespace) for a logical namespace."""
+        aliases = self.load()
+        index_name = aliases.get("index_name") or Config.PINECONE_INDEX_NAME
+        return index_name, aliases.get("namespaces", {}).get(namespace, namespace)
+
+
+    def namespaces_missing_for(self, namespaces: Dict[str, str]) -> Set[str]:
+        """Aliased logical namespaces that a swap to `namespaces` would leave on their old physical namespaces."""
+        current = self.load(force=True)
+        return set(current.get("namespaces", {})) - set(namespaces)
+
+
+    def swap(self, namespaces: Dict[str, str], index_name: Optional[str] = None) -> Dict:
+        """
+        Point logical namespaces at new physical namespaces (and optionally a new index) in one write.
+        Every currently aliased namespace must be part of the swap, so no collection is left on a stale namespace.
+        """
+        try:
+            missing = self.namespaces_missing_for(namespaces)
+            if missing:
+                raise ValueError(f"Namespaces {sorted(missing)} have not been rebuilt")
+            current = self.load(force=True)
+            updated = {
+                "index_name": index_name or current.get("index_name") or Config.PINECONE_INDEX_NAME,
+                "namespaces": {**current.get("namespaces", {}), **namespaces},
+                "updated_at": int(time.time()),
+                "previous": {key: value for key, value in current.items() if key != "previous"}
+            }
+            # Repeating a swap (e.g. after a resumed run) must not replace the rollback target with the live mapping
+            if current and updated["index_name"] == current.get("index_name") and updated["namespaces"] == current.get("namespaces"):
+                logging.info("Index aliases already point at the requested namespaces; nothing to swap")
+                return current
+            self.s3_storage.write_json(self.key, updated)
+            with self._lock:
+                self._aliases = updated
+                self._loaded_at = time.monotonic()
+            logging.info(f"Index aliases swapped: {updated['namespaces']} on index {updated['index_name']}")
+            return updated
+        except Exception as e:
+            logging.error(f"Error swapping index aliases: {str(e)}")
+            raise CustomException(e, sys)
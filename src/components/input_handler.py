@@ -1,8 +1,10 @@
 import re
 import sys
-from typing import Dict
+import time
+from typing import Dict, Optional
 
 from src.utils.process_file_utils import ProcessFileUtils
+from src.utils.deadline import Deadline
 from src.logger import logging
 from src.exception import CustomException
 
@@ -28,12 +30,15 @@ class UserInputHandler:
             raise CustomException(e, sys)
         
 
-    def process_file(self, file_path, PDF_Processing_Method: str = None) -> Dict:
+    def process_file(self, file_path, PDF_Processing_Method: str = None, collection: Optional[str] = None, deadline: Optional[Deadline] = None, uploaded_at: Optional[int] = None) -> Dict:
         """
         Process the uploaded file and return chunked documents.
         Args:
             file_path (str): Path to the uploaded file.
             PDF_Processing_Method (str, optional): Method for processing PDF files. Defaults to None.
+            collection (str, optional): Collection/tenant the document belongs to. Defaults to None.
+            deadline (Deadline, optional): Request deadline, checked between pages. Defaults to None.
+            uploaded_at (int, optional): Original upload time (epoch seconds) when re-indexing. Defaults to now.
         
         PDF_Processing_Method: "standard text extraction" or "ocr based extraction"
         """
@@ -41,12 +46,14 @@ class UserInputHandler:
             logging.info(f"Processing file: {file_path} with PDF_Processing_Method: {PDF_Processing_Method}")
             PDF_Processing_Method = PDF_Processing_Method.strip().lower() if PDF_Processing_Method else None
             text = ""
+            pages = None
             if file_path.endswith('.pdf'):
                 # Text extraction for PDF
-                if PDF_Processing_Method == "standard text extraction":  ## Using PyMuPDF
-                    text += self.utils.extract_pdf_text(file_path)
+                if PDF_Processing_Method == "standard text extraction":  ## Using PyMuPDF, page-sharded for large PDFs
+                    pages = self.utils.extract_pdf_pages(file_path, deadline=deadline)
+                    text += "".join(pages)
                 elif PDF_Processing_Method == "ocr based extraction":                                                    
-                    text += self.utils.extract_pdf_text_with_ocr(file_path) ## Using easyocr
+                    text += self.utils.extract_pdf_text_with_ocr(file_path, deadline=deadline) ## Using easyocr
                 else:
                     raise ValueError("Invalid PDF Processing Method. Choose 'standard text extraction' or 'ocr based extraction'")
             # Reading txt file using utf-8 encoding
@@ -61,10 +68,21 @@ class UserInputHandler:
         
         try:
             logging.debug("Cleaning and chunking extracted text")
-            # Clean the text
-            cleaned_text = self.utils.clean_text(text)
+            # Clean the text; per-page text keeps page offsets for page-number metadata
+            page_offsets = None
+            if pages is not None:
+                cleaned_text, page_offsets = self.utils.clean_pages(pages)
+            else:
+                cleaned_text = self.utils.clean_text(text)
             # Chunk the text with file_path with metadata
-            documents = self.utils.chunk_text(cleaned_text, file_path, chunk_size=1000, chunk_overlap=200)
+            documents = self.utils.chunk_text(cleaned_text, file_path, chunk_size=1000, chunk_overlap=200, page_offsets=page_offsets)
+            # Tag chunks for collection and upload-date filtering
+            if uploaded_at is None:
+                uploaded_at = int(time.time())
+            for document in documents:
+                document.metadata["uploaded_at"] = uploaded_at
+                if collection:
+                    document.metadata["collection"] = collection
             logging.info("File processing completed successfully")
             return documents
         except Exception as e:
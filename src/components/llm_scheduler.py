@@ -0,0 +1,262 @@
+import re
+import sys
+import time
+import heapq
+import random
+import itertools
+import threading
+from enum import IntEnum
+from typing import Dict, Optional
+from euriai.langchain import create_chat_model
+
+from src.config import Config
+from src.utils.deadline import Deadline
+from src.utils.metrics import metrics
+from src.logger import logging
+from src.exception import CustomException
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class LLMRateLimitError(Exception):
+    """Raised when an upstream model is still rate limited after all retries."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously; `capacity` tokens per minute."""
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+
+    def time_until_available(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # Requests larger than the bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+
+    def consume(self, amount: float, now: float) -> None:
+        self._refill(now)
+        # May go negative when actual usage exceeds the estimate; later callers wait it off
+        self.tokens -= amount
+
+
+class _ModelQueue:
+    def __init__(self, limits: Dict):
+        self.requests = TokenBucket(limits["requests_per_minute"])
+        self.tokens = TokenBucket(limits["tokens_per_minute"])
+        self.max_concurrency = limits["max_concurrency"]
+        self.active = 0
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.condition = threading.Condition()
+
+
+class LLMScheduler:
+    """
+    Scheduler in front of every chat-model call.
+
+    Each model gets request/min and token/min token buckets, bounded concurrency
+    and a priority queue, so interactive requests overtake background work.
+    Rate-limit (429) and transient upstream errors are retried with jittered
+    exponential backoff, honouring Retry-After when the provider sends it.
+    """
+    RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+    CANCEL_POLL_SECONDS = 0.05
+
+    def __init__(self):
+        logging.info("Initializing LLMScheduler")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._models: Dict[str, object] = {}
+        self._sequence = itertools.count()
+
+
+    def _get_queue(self, model: str) -> _ModelQueue:
+        with self._lock:
+            if model not in self._queues:
+                limits = Config.LLM_RATE_LIMITS.get(model, Config.LLM_DEFAULT_RATE_LIMIT)
+                self._queues[model] = _ModelQueue(limits)
+            return self._queues[model]
+
+
+    def _get_model(self, model: str):
+        # Chat model clients are reused across calls instead of being rebuilt per request
+        with self._lock:
+            if model not in self._models:
+                self._models[model] = create_chat_model(
+                    api_key=Config.EURIAI_API_KEY,
+                    model=model,
+                    temperature=Config.TEMPERATURE
+                )
+            return self._models[model]
+
+
+    @staticmethod
+    def estimate_tokens(prompt: str) -> int:
+        # ~4 characters per token for the prompt plus the expected completion
+        return len(prompt) // 4 + Config.LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+    def _acquire(self, model: str, queue: _ModelQueue, tokens: int, priority: Priority, deadline: Optional[Deadline] = None) -> None:
+        entry = (int(priority), next(self._sequence))
+        enqueued_at = time.monotonic()
+        with queue.condition:
+            heapq.heappush(queue.waiters, entry)
+            metrics.set_gauge(f"llm.{model}.queue_depth", len(queue.waiters))
+            while True:
+                now = time.monotonic()
+                if deadline is not None and deadline.done:
+                    queue.waiters.remove(entry)
+                    heapq.heapify(queue.waiters)
+                    metrics.set_gauge(f"llm.{model}.queue_depth", len(queue.waiters))
+                    metrics.increment(f"llm.{model}.cancelled")
+                    queue.condition.notify_all()
+                    deadline.check(f"llm.{model}.queue")
+                if queue.waiters[0] == entry and queue.active < queue.max_concurrency:
+                    wait = max(
+                        queue.requests.time_until_available(1, now),
+                        queue.tokens.time_until_available(tokens, now),
+                        queue.blocked_until - now
+                    )
+                    if wait <= 0:
+                        queue.requests.consume(1, now)
+                        queue.tokens.consume(tokens, now)
+                        heapq.heappop(queue.waiters)
+                        queue.active += 1
+                        queue.condition.notify_all()
+                        break
+                    queue.condition.wait(timeout=wait if deadline is None else min(wait, self.CANCEL_POLL_SECONDS))
+                else:
+                    queue.condition.wait(timeout=None if deadline is None else self.CANCEL_POLL_SECONDS)
+            metrics.set_gauge(f"llm.{model}.queue_depth", len(queue.waiters))
+            metrics.set_gauge(f"llm.{model}.active", queue.active)
+        metrics.observe(f"llm.{model}.wait_seconds", time.monotonic() - enqueued_at)
+
+
+    def _release(self, model: str, queue: _ModelQueue) -> None:
+        with queue.condition:
+            queue.active -= 1
+            metrics.set_gauge(f"llm.{model}.active", queue.active)
+            queue.condition.notify_all()
+
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status_code is not None:
+            return int(status_code)
+        message = str(error).lower()
+        if "429" in message or "rate limit" in message or "too many requests" in message:
+            return 429
+        return None
+
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if value is None:
+            match = re.search(r"retry[- ]after[^0-9]*([0-9]+(?:\.[0-9]+)?)", str(error), re.IGNORECASE)
+            value = match.group(1) if match else None
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter exponential backoff
+        ceiling = min(Config.LLM_BACKOFF_MAX_SECONDS, Config.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+    def invoke(self, model: str, prompt: str, priority: Priority = Priority.INTERACTIVE, deadline: Optional[Deadline] = None, dispatched: Optional[threading.Event] = None) -> str:
+        """
+        Run a chat completion through the model's queue and return the response text.
+        When the deadline is cancelled or expires the call is dropped if it is still
+        queued or between retries; a request already sent upstream runs to completion.
+        `dispatched` is set once the call leaves the queue. `llm.<model>.latency_seconds`
+        records upstream latency only, excluding queue wait and retry backoff.
+        """
+        queue = self._get_queue(model)
+        tokens = self.estimate_tokens(prompt)
+        metrics.increment(f"llm.{model}.requests")
+        for attempt in range(Config.LLM_MAX_RETRIES + 1):
+            self._acquire(model, queue, tokens, priority, deadline)
+            if dispatched is not None:
+                dispatched.set()
+            try:
+                started_at = time.monotonic()
+                response = self._get_model(model).invoke(prompt)
+                metrics.observe(f"llm.{model}.latency_seconds", time.monotonic() - started_at)
+                # Charge the token bucket for any usage beyond the estimate
+                usage = getattr(response, "usage_metadata", None) or {}
+                if usage.get("total_tokens", 0) > tokens:
+                    with queue.condition:
+                        queue.tokens.consume(usage["total_tokens"] - tokens, time.monotonic())
+                return response.content
+            except Exception as e:
+                status_code = self._status_code(e)
+                if status_code not in self.RETRYABLE_STATUS_CODES:
+                    metrics.increment(f"llm.{model}.errors")
+                    raise
+                retry_after = self._retry_after(e)
+                if status_code == 429:
+                    metrics.increment(f"llm.{model}.rate_limited")
+                    # Pause the whole model queue, not just this caller
+                    if retry_after:
+                        with queue.condition:
+                            queue.blocked_until = max(queue.blocked_until, time.monotonic() + retry_after)
+                if attempt == Config.LLM_MAX_RETRIES:
+                    metrics.increment(f"llm.{model}.errors")
+                    if status_code == 429:
+                        raise LLMRateLimitError(f"Model {model} is rate limited: {str(e)}", retry_after=retry_after)
+                    raise
+                # Jitter Retry-After too, so queued callers do not retry in lockstep
+                delay = retry_after + random.uniform(0, Config.LLM_BACKOFF_BASE_SECONDS) if retry_after is not None else self._backoff(attempt)
+                metrics.increment(f"llm.{model}.retries")
+                logging.warning(f"Upstream error {status_code} from {model}, retrying in {delay:.2f}s (attempt {attempt + 1})")
+            finally:
+                self._release(model, queue)
+            if deadline is not None:
+                # No point backing off past the deadline
+                deadline.require(delay, f"llm.{model}.retry")
+                deadline.cancel_event.wait(delay)
+                deadline.check(f"llm.{model}.retry")
+            else:
+                time.sleep(delay)
+
+
+_shared_scheduler: Optional[LLMScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by every component that calls a chat model."""
+    global _shared_scheduler
+    try:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = LLMScheduler()
+            return _shared_scheduler
+    except Exception as e:
+        logging.error(f"Error initializing LLMScheduler: {str(e)}")
+        raise CustomException(e, sys)
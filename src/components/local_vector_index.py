@@ -0,0 +1,141 @@
+import math
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from src.logger import logging
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if operator == "$exists":
+        return (value is not None) == bool(operand)
+    # Range operators never match a missing or non-numeric value
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_filter(metadata: Dict, metadata_filter: Optional[Dict]) -> bool:
+    """
+    Evaluate a Pinecone metadata filter against a metadata dict.
+
+    Supports $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $exists, $and, $or and the
+    implicit `{"field": value}` equality form. As in Pinecone, $ne and $nin match
+    records where the field is missing.
+    """
+    if not metadata_filter:
+        return True
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, operand in condition.items():
+                # List-valued metadata matches if any element matches
+                if isinstance(value, list) and operator in ("$eq", "$in"):
+                    if not any(_compare(item, operator, operand) for item in value):
+                        return False
+                elif isinstance(value, list) and operator in ("$ne", "$nin"):
+                    if not all(_compare(item, operator, operand) for item in value):
+                        return False
+                elif not _compare(value, operator, operand):
+                    return False
+    return True
+
+
+class LocalVectorIndex:
+    """
+    In-memory stand-in for a Pinecone index, used for local development and tests.
+    Mirrors the subset of the Pinecone Index API used by VectorDBClient
+    (upsert, query, fetch, delete) including namespaces and metadata filters.
+    """
+    def __init__(self):
+        logging.info("Initializing in-memory LocalVectorIndex")
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, Dict[str, Dict]] = {}
+
+
+    def upsert(self, vectors: List[Dict], namespace: str = "") -> Dict:
+        with self._lock:
+            records = self._namespaces.setdefault(namespace, {})
+            for vector in vectors:
+                records[vector["id"]] = {
+                    "values": list(vector["values"]),
+                    "metadata": dict(vector.get("metadata") or {})
+                }
+        return {"upserted_count": len(vectors)}
+
+
+    def fetch(self, ids: List[str], namespace: str = "") -> SimpleNamespace:
+        with self._lock:
+            records = self._namespaces.get(namespace, {})
+            vectors = {
+                record_id: SimpleNamespace(id=record_id, values=records[record_id]["values"], metadata=dict(records[record_id]["metadata"]))
+                for record_id in ids if record_id in records
+            }
+        return SimpleNamespace(vectors=vectors, namespace=namespace)
+
+
+    def delete(self, ids: List[str], namespace: str = "") -> Dict:
+        with self._lock:
+            records = self._namespaces.get(namespace, {})
+            for record_id in ids:
+                records.pop(record_id, None)
+        return {}
+
+
+    @staticmethod
+    def _cosine_similarity(a: List[float], b: List[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+
+    def query(self, vector: List[float], top_k: int = 5, filter: Optional[Dict] = None, include_metadata: bool = False, namespace: str = "") -> Dict:
+        with self._lock:
+            records = list(self._namespaces.get(namespace, {}).items())
+        matches = []
+        for record_id, record in records:
+            if not matches_filter(record["metadata"], filter):
+                continue
+            match = {"id": record_id, "score": self._cosine_similarity(vector, record["values"])}
+            if include_metadata:
+                match["metadata"] = dict(record["metadata"])
+            matches.append(match)
+        matches.sort(key=lambda match: match["score"], reverse=True)
+        return {"matches": matches[:top_k], "namespace": namespace}
+
+
+_shared_index: Optional[LocalVectorIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_local_vector_index() -> LocalVectorIndex:
+    """Process-wide LocalVectorIndex, so every VectorDBClient sees the same data."""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = LocalVectorIndex()
+        return _shared_index
@@ -0,0 +1,142 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+
+from src.config import Config
+from src.components.llm_scheduler import LLMScheduler, Priority, get_llm_scheduler
+from src.utils.deadline import Deadline
+from src.utils.metrics import metrics
+from src.logger import logging
+from src.exception import CustomException
+
+
+class ModelRouter:
+    """
+    Per-task routing policy over the chat models (Config.TASK_ROUTING).
+
+    Each task has a primary model and an ordered fallback list. When hedging is
+    enabled and the primary has not answered by its hedge deadline (a fixed
+    value or its rolling latency quantile), a duplicate request is sent to the
+    first fallback; the first successful answer wins and the other is cancelled.
+    With a request deadline, models whose median latency no longer fits the
+    remaining budget are skipped, and nothing falls back once the request is
+    cancelled or out of time.
+    """
+    def __init__(self, scheduler: Optional[LLMScheduler] = None):
+        try:
+            logging.info("Initializing ModelRouter")
+            self.scheduler = scheduler or get_llm_scheduler()
+            self.routes: Dict[str, Dict] = Config.TASK_ROUTING
+            self._executor = ThreadPoolExecutor(max_workers=Config.ROUTER_MAX_WORKERS, thread_name_prefix="model-router")
+            logging.info("ModelRouter initialized successfully")
+        except Exception as e:
+            logging.error(f"Error initializing ModelRouter: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    def hedge_deadline(self, model: str, route: Dict) -> float:
+        """Seconds to wait for the primary before sending the hedge request."""
+        if route.get("hedge_after_seconds"):
+            return route["hedge_after_seconds"]
+        latency_metric = f"llm.{model}.latency_seconds"
+        if metrics.count(latency_metric) < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DEFAULT_DEADLINE_SECONDS
+        return metrics.percentile(latency_metric, Config.HEDGE_LATENCY_QUANTILE)
+
+
+    def expected_latency(self, model: str) -> float:
+        """Median observed latency of the model, or 0 until enough samples exist."""
+        latency_metric = f"llm.{model}.latency_seconds"
+        if metrics.count(latency_metric) < Config.HEDGE_MIN_SAMPLES:
+            return 0.0
+        return metrics.percentile(latency_metric, 0.5)
+
+
+    def _invoke(self, model: str, prompt: str, priority: Priority, deadline: Optional[Deadline] = None, dispatched: Optional[threading.Event] = None) -> str:
+        if deadline is not None:
+            deadline.require(self.expected_latency(model), f"llm.{model}")
+        return self.scheduler.invoke(model, prompt, priority=priority, deadline=deadline, dispatched=dispatched)
+
+
+    def _hedged_invoke(self, task_type: str, primary: str, secondary: str, route: Dict, prompt: str, priority: Priority, deadline: Optional[Deadline] = None) -> str:
+        # Each leg can be cancelled on its own, and both are cancelled with the request
+        legs = {model: deadline.child() if deadline is not None else Deadline() for model in (primary, secondary)}
+        dispatched = threading.Event()
+        primary_future = self._executor.submit(self._invoke, primary, prompt, priority, legs[primary], dispatched)
+        primary_future.add_done_callback(lambda _: dispatched.set())
+        futures = {primary_future: primary}
+        # The hedge timer starts once the primary is sent upstream, not while it waits in the queue
+        dispatched.wait()
+        done, _ = wait(futures, timeout=self.hedge_deadline(primary, route))
+        if done:
+            primary_future = next(iter(done))
+            if primary_future.exception() is None:
+                return primary_future.result()
+            if deadline is not None and deadline.done:
+                raise primary_future.exception()
+            # Primary failed before the deadline; fall back to the hedge model directly
+            logging.warning(f"Model {primary} failed for {task_type} ({str(primary_future.exception())}), falling back to {secondary}")
+            metrics.increment(f"router.{task_type}.failures")
+            metrics.increment(f"router.{task_type}.fallbacks")
+            return self._invoke(secondary, prompt, priority, deadline)
+
+        if deadline is not None:
+            # Don't hedge (or keep waiting) for a request that is already abandoned
+            deadline.check(f"router.{task_type}.hedge")
+        logging.info(f"Primary model {primary} exceeded hedge deadline for {task_type}, hedging with {secondary}")
+        metrics.increment(f"router.{task_type}.hedges")
+        futures[self._executor.submit(self._invoke, secondary, prompt, priority, legs[secondary])] = secondary
+        pending = set(futures)
+        last_error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        last_error = future.exception()
+                        continue
+                    winner = futures[future]
+                    # Cancel the loser; if it is already upstream its result is discarded
+                    for other in pending:
+                        legs[futures[other]].cancel("lost hedge race")
+                        other.cancel()
+                    if winner == secondary:
+                        metrics.increment(f"router.{task_type}.hedge_wins")
+                    return future.result()
+            raise last_error
+        finally:
+            # Every finished hedge counts, including ones where both legs failed
+            metrics.set_gauge(
+                f"router.{task_type}.hedge_win_rate",
+                metrics.counter(f"router.{task_type}.hedge_wins") / metrics.counter(f"router.{task_type}.hedges")
+            )
+
+
+    def generate(self, task_type: str, prompt: str, priority: Priority = Priority.INTERACTIVE, deadline: Optional[Deadline] = None) -> str:
+        """Generate a response for the task, applying its hedge and fallback policy."""
+        route = self.routes[task_type]
+        candidates: List[str] = [route["primary"], *route.get("fallbacks", [])]
+        metrics.increment(f"router.{task_type}.requests")
+        last_error = None
+        position = 0
+        while position < len(candidates):
+            model = candidates[position]
+            try:
+                # Only interactive requests are hedged; background work just falls back
+                if position == 0 and route.get("hedge") and priority == Priority.INTERACTIVE and len(candidates) > 1:
+                    # The hedge model doubles as the first fallback
+                    position = 2
+                    return self._hedged_invoke(task_type, model, candidates[1], route, prompt, priority, deadline)
+                position += 1
+                return self._invoke(model, prompt, priority, deadline)
+            except Exception as e:
+                if deadline is not None and deadline.done:
+                    # Cancelled or out of time: falling back would only waste upstream capacity
+                    raise
+                last_error = e
+                metrics.increment(f"router.{task_type}.failures")
+                if position < len(candidates):
+                    metrics.increment(f"router.{task_type}.fallbacks")
+                    logging.warning(f"Model {model} failed for {task_type} ({str(e)}), falling back to {candidates[position]}")
+        raise last_error
@@ -1,7 +1,10 @@
 import sys
-from typing import List, Dict
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional
 
+from src.config import Config
 from src.components.vector_db_client import VectorDBClient
+from src.utils.deadline import Deadline
 from src.utils.prompt_templates import explanation_prompt_template, quiz_prompt_template, summary_prompt_template
 from src.logger import logging
 from src.exception import CustomException
@@ -19,6 +22,40 @@ class RAGEngine:
             raise CustomException(e, sys)
         
 
+    ## build Pinecone metadata filter from optional request scopes
+    def build_metadata_filter(self, source: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Optional[Dict]:
+        """
+        Build a metadata filter from optional scopes.
+        Args:
+            source (str, optional): Exact source filename.
+            date_from (str, optional): Earliest upload date, inclusive (YYYY-MM-DD).
+            date_to (str, optional): Latest upload date, inclusive (YYYY-MM-DD).
+        """
+        try:
+            conditions = []
+            if source and source.strip():
+                conditions.append({"source": {"$eq": source.strip()}})
+            if date_from and date_from.strip():
+                start = datetime.strptime(date_from.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                conditions.append({"uploaded_at": {"$gte": int(start.timestamp())}})
+            if date_to and date_to.strip():
+                end = datetime.strptime(date_to.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+                conditions.append({"uploaded_at": {"$lt": int(end.timestamp())}})
+            if not conditions:
+                return None
+            return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+        except Exception as e:
+            logging.error(f"Error building metadata filter: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    # combine level filter with request scope filter
+    def _combine_filters(self, level_filter: Dict, metadata_filter: Optional[Dict]) -> Dict:
+        if not metadata_filter:
+            return level_filter
+        return {"$and": [level_filter, metadata_filter]}
+
+
     # format context helper function
     def _format_context(self, similar_results: List[Dict]) -> str:
         try:
@@ -29,8 +66,12 @@ class RAGEngine:
                 score  = result.get('score', 0)
                 chunk_text = metadata.get('text', '')
                 source = metadata.get('source', 'Unknown Source')
-                chunk_index = metadata.get('chunk_index', 'N/A')
-                context += f"Source: {source}, Chunk Index: {chunk_index}, Similarity Score: {score:.4f}\n{chunk_text}\n\n"
+                level = metadata.get('level', 'chunk')
+                if level == 'chunk':
+                    chunk_index = metadata.get('chunk_index', 'N/A')
+                    context += f"Source: {source}, Chunk Index: {chunk_index}, Similarity Score: {score:.4f}\n{chunk_text}\n\n"
+                else:
+                    context += f"Source: {source}, Summary Level: {level}, Similarity Score: {score:.4f}\n{chunk_text}\n\n"
             logging.info("Context formatted successfully")
             return context.strip()
         except Exception as e:
@@ -39,10 +80,12 @@ class RAGEngine:
         
 
     ## retrieve context
-    def retrieve_context(self, user_query: str, top_k: int = 5, relevance_threshold: float = 0.5) -> str:
+    def retrieve_context(self, user_query: str, top_k: int = 5, relevance_threshold: float = 0.5, metadata_filter: Optional[Dict] = None, namespace: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
         try:
             logging.info(f"Retrieving context for user query: {user_query}")
-            similar_results = self.vector_db_client.query_similar(user_query, top_k=top_k)
+            # Plain chunk retrieval skips precomputed summary nodes
+            chunk_filter = self._combine_filters({"level": {"$nin": list(Config.SUMMARY_TREE_LEVELS)}}, metadata_filter)
+            similar_results = self.vector_db_client.query_similar(user_query, top_k=top_k, metadata_filter=chunk_filter, namespace=namespace, deadline=deadline)
             # Filter results based on relevance threshold
             filtered_results = [res for res in similar_results if res['score'] >= relevance_threshold]
             # Handle case with no relevant documents
@@ -59,6 +102,27 @@ class RAGEngine:
         except Exception as e:
             logging.error(f"Error retrieving context: {str(e)}")
             raise CustomException(e, sys)
+
+
+    ## retrieve precomputed summary nodes, falling back to raw chunks
+    def retrieve_summary_context(self, user_query: str, top_k: int = 5, relevance_threshold: float = 0.5, metadata_filter: Optional[Dict] = None, namespace: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+        try:
+            logging.info(f"Retrieving summary context for user query: {user_query}")
+            summary_filter = self._combine_filters({"level": {"$in": list(Config.SUMMARY_TREE_LEVELS)}}, metadata_filter)
+            similar_results = self.vector_db_client.query_similar(user_query, top_k=top_k, metadata_filter=summary_filter, namespace=namespace, deadline=deadline)
+            filtered_results = [res for res in similar_results if res['score'] >= relevance_threshold]
+            if not filtered_results:
+                logging.info("No precomputed summaries found, falling back to chunk retrieval")
+                return self.retrieve_context(user_query, top_k=top_k, relevance_threshold=relevance_threshold, metadata_filter=metadata_filter, namespace=namespace, deadline=deadline)
+            # Coarsest summaries first (deeper section rounds are coarser), then by score
+            rank = {level: idx for idx, level in enumerate(reversed(Config.SUMMARY_TREE_LEVELS))}
+            sorted_results = sorted(filtered_results, key=lambda x: (rank.get(x['metadata'].get('level'), len(rank)), -x['metadata'].get('depth', 0), -x['score']))
+            context = self._format_context(sorted_results)
+            logging.info("Summary context retrieved and formatted successfully")
+            return context
+        except Exception as e:
+            logging.error(f"Error retrieving summary context: {str(e)}")
+            raise CustomException(e, sys)
         
 
     # Assemble prompt
@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.deadline import Deadline
+from src.utils.metrics import metrics
+from src.logger import logging
+
+
+
+class _InFlight:
+    __slots__ = ("task", "deadline", "callers")
+
+    def __init__(self, task: asyncio.Future, deadline: Optional[Deadline]):
+        self.task = task
+        self.deadline = deadline
+        self.callers = 0
+
+
+class RequestCoalescer:
+    """
+    Single-flight execution of identical in-flight requests.
+
+    Concurrent callers with the same key attach to one running computation and
+    all receive its result (or its error). Nothing is cached once the computation
+    finishes, so a later request with the same key runs again.
+
+    When callers pass a deadline, the computation gets a shared deadline that
+    lasts as long as the latest caller's, and is cancelled once every caller
+    has gone away (disconnected or timed out).
+    """
+    def __init__(self, name: str = "generate"):
+        self.name = name
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+
+
+    @staticmethod
+    def make_key(task_type: str, user_query: str, *scope: Hashable) -> Tuple:
+        # Normalize query so trivially different spellings of the same prompt coalesce;
+        # any retrieval scope (namespace, filters) is part of the key
+        normalized_query = " ".join(user_query.lower().split())
+        return (task_type.strip().lower(), normalized_query, *scope)
+
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        entry = self._in_flight.get(key)
+        if entry is not None and entry.task is task:
+            del self._in_flight[key]
+        metrics.set_gauge(f"{self.name}.coalescer.in_flight", len(self._in_flight))
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+    async def run(self, key: Hashable, func: Callable[..., Any], *args, deadline: Optional[Deadline] = None, **kwargs) -> Any:
+        """
+        Run a blocking function in a worker thread, sharing the result with every
+        concurrent caller that uses the same key. With a deadline, `func` is called
+        with the computation's shared deadline as its `deadline` keyword argument.
+        """
+        metrics.increment(f"{self.name}.coalescer.requests")
+        entry = self._in_flight.get(key)
+        # A computation every caller abandoned is winding down; don't attach to it
+        if entry is None or (entry.deadline is not None and entry.deadline.cancelled):
+            logging.debug(f"Starting new in-flight computation for key: {key}")
+            metrics.increment(f"{self.name}.coalescer.executions")
+            shared_deadline = None
+            if deadline is not None:
+                shared_deadline = Deadline()
+                shared_deadline.expires_at = deadline.expires_at
+                kwargs["deadline"] = shared_deadline
+            task = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+            entry = _InFlight(task, shared_deadline)
+            self._in_flight[key] = entry
+            task.add_done_callback(lambda done, key=key: self._on_done(key, done))
+            metrics.set_gauge(f"{self.name}.coalescer.in_flight", len(self._in_flight))
+        else:
+            logging.info(f"Attaching to in-flight computation for key: {key}")
+            metrics.increment(f"{self.name}.coalescer.waiters")
+            if entry.deadline is not None:
+                # A caller without a deadline keeps the computation alive indefinitely
+                entry.deadline.extend_to(deadline or Deadline())
+        self._update_dedup_ratio()
+        entry.callers += 1
+        try:
+            # Shield the shared task so one caller going away does not cancel it for the others
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.callers -= 1
+            if entry.callers == 0 and not entry.task.done() and entry.deadline is not None:
+                logging.info(f"All callers gave up, cancelling in-flight computation for key: {key}")
+                metrics.increment(f"{self.name}.coalescer.abandoned")
+                entry.deadline.cancel("abandoned by every caller")
+
+
+    def _update_dedup_ratio(self) -> None:
+        requests = metrics.counter(f"{self.name}.coalescer.requests")
+        waiters = metrics.counter(f"{self.name}.coalescer.waiters")
+        metrics.set_gauge(f"{self.name}.coalescer.dedup_ratio", waiters / requests if requests else 0.0)
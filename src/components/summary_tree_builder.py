@@ -0,0 +1,167 @@
+import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from langchain_core.documents import Document
+
+from src.config import Config
+from src.components.vector_db_client import VectorDBClient
+from src.components.generative_ai import GenerativeAI
+from src.components.llm_scheduler import Priority
+from src.utils.prompt_templates import node_summary_prompt_template
+from src.logger import logging
+from src.exception import CustomException
+
+
+class SummaryTreeBuilder:
+    """
+    Builds a hierarchical summary tree per document after its chunks are stored:
+    chunk-group summaries -> section summaries -> one document summary.
+    Sections are summarized again (depth 1, 2, ...) with the same fan-in until at
+    most SUMMARY_TREE_SECTION_SIZE remain, so no prompt grows with document length.
+
+    Every node is stored in the vector index with a `level` metadata tag so
+    retrieval can pick the granularity it needs. Node ids are deterministic and
+    each node records a hash of its inputs, so rebuilding an unchanged document
+    reuses the stored nodes instead of calling the LLM again, and nodes left over
+    from a longer previous version of the document are deleted.
+    """
+    def __init__(self, vector_db_client: Optional[VectorDBClient] = None, generative_ai: Optional[GenerativeAI] = None):
+        try:
+            logging.info("Initializing SummaryTreeBuilder")
+            self.vector_db_client = vector_db_client or VectorDBClient()
+            self.generative_ai = generative_ai or GenerativeAI()
+            self.fan_in = {
+                "group": Config.SUMMARY_TREE_GROUP_SIZE,
+                "section": Config.SUMMARY_TREE_SECTION_SIZE,
+                "document": Config.SUMMARY_TREE_SECTION_SIZE
+            }
+            self.max_workers = Config.SUMMARY_TREE_MAX_WORKERS
+            logging.info("SummaryTreeBuilder initialized successfully")
+        except Exception as e:
+            logging.error(f"Error initializing SummaryTreeBuilder: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    @staticmethod
+    def node_id(source: str, level: str, node_index: int, depth: int = 0) -> str:
+        if depth:
+            return f"{source}_summary_{level}{depth}_{node_index}"
+        return f"{source}_summary_{level}_{node_index}"
+
+
+    @staticmethod
+    def _content_hash(texts: List[str]) -> str:
+        digest = hashlib.sha1()
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+
+    def _summarize(self, texts: List[str], level: str) -> str:
+        # A single child carries no new information, so reuse its summary as is
+        if level != "group" and len(texts) == 1:
+            return texts[0]
+        prompt = node_summary_prompt_template("\n\n".join(texts), level)
+        # Background ingestion work yields to interactive requests
+        return self.generative_ai.generate_summary(prompt, priority=Priority.BATCH)
+
+
+    def _delete_stale_nodes(self, source: str, level: str, first_stale_index: int, namespace: Optional[str], depth: int = 0) -> int:
+        """Delete nodes beyond the current node count; node ids are contiguous from 0."""
+        batch_size = Config.EMBEDDING_BATCH_SIZE
+        deleted = 0
+        start = first_stale_index
+        while True:
+            ids = [self.node_id(source, level, idx, depth) for idx in range(start, start + batch_size)]
+            existing = self.vector_db_client.fetch_metadata(ids, namespace=namespace)
+            if not existing:
+                break
+            self.vector_db_client.delete(list(existing), namespace=namespace)
+            deleted += len(existing)
+            start += batch_size
+        if deleted:
+            logging.info(f"Deleted {deleted} stale '{level}' summary nodes for {source}")
+        return deleted
+
+
+    def _build_level(self, source: str, level: str, child_texts: List[str], base_metadata: Dict, namespace: Optional[str], depth: int = 0) -> List[str]:
+        fan_in = self.fan_in[level]
+        groups = [child_texts[i:i + fan_in] for i in range(0, len(child_texts), fan_in)]
+        ids = [self.node_id(source, level, idx, depth) for idx in range(len(groups))]
+        hashes = [self._content_hash(group) for group in groups]
+
+        # Reuse nodes whose inputs have not changed since the last build
+        existing = self.vector_db_client.fetch_metadata(ids, namespace=namespace)
+        summaries: List[Optional[str]] = [None] * len(groups)
+        stale = []
+        for idx, (node_id, content_hash) in enumerate(zip(ids, hashes)):
+            stored = existing.get(node_id)
+            if stored and stored.get("content_hash") == content_hash:
+                summaries[idx] = stored.get("text", "")
+            else:
+                stale.append(idx)
+        logging.info(f"Summary level '{level}' (depth {depth}) for {source}: {len(groups)} nodes, {len(stale)} to (re)build")
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = executor.map(lambda idx: self._summarize(groups[idx], level), stale)
+                for idx, summary in zip(stale, results):
+                    summaries[idx] = summary
+            documents = [
+                Document(
+                    page_content=summaries[idx],
+                    metadata={
+                        **base_metadata,
+                        "source": source,
+                        "level": level,
+                        "depth": depth,
+                        "node_index": idx,
+                        "child_count": len(groups[idx]),
+                        "content_hash": hashes[idx],
+                        "text": summaries[idx]
+                    }
+                )
+                for idx in stale
+            ]
+            self.vector_db_client.store_embeddings(documents, ids=[ids[idx] for idx in stale], namespace=namespace)
+        self._delete_stale_nodes(source, level, len(groups), namespace, depth)
+        return summaries
+
+
+    def build_tree(self, documents: List[Document], namespace: Optional[str] = None) -> Dict[str, int]:
+        """
+        Build (or incrementally refresh) the summary tree for the chunks of one document,
+        stored in the same namespace as the chunks. Returns the number of nodes at each level.
+        """
+        try:
+            if not documents:
+                raise ValueError("No documents provided for summary tree building.")
+            source = documents[0].metadata["source"]
+            logging.info(f"Building summary tree for {source} from {len(documents)} chunks")
+            child_texts = [doc.page_content for doc in documents]
+            # Summary nodes inherit the document-level tags used by retrieval filters
+            base_metadata = {key: documents[0].metadata[key] for key in ("collection", "uploaded_at") if key in documents[0].metadata}
+            group_level, section_level, document_level = Config.SUMMARY_TREE_LEVELS
+            child_texts = self._build_level(source, group_level, child_texts, base_metadata, namespace)
+            node_counts = {group_level: len(child_texts), section_level: 0}
+            # Reduce sections with the same fan-in until one document prompt can hold them
+            depth = 0
+            while True:
+                child_texts = self._build_level(source, section_level, child_texts, base_metadata, namespace, depth)
+                node_counts[section_level] += len(child_texts)
+                if len(child_texts) <= self.fan_in[section_level]:
+                    break
+                depth += 1
+            # Drop deeper section rounds left over from a longer previous version
+            stale_depth = depth + 1
+            while self._delete_stale_nodes(source, section_level, 0, namespace, stale_depth):
+                stale_depth += 1
+            child_texts = self._build_level(source, document_level, child_texts, base_metadata, namespace)
+            node_counts[document_level] = len(child_texts)
+            logging.info(f"Summary tree built for {source}: {node_counts}")
+            return node_counts
+        except Exception as e:
+            logging.error(f"Error building summary tree: {str(e)}")
+            raise CustomException(e, sys)
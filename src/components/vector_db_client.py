@@ -1,73 +1,174 @@
+import re
 import sys
 from pinecone import Pinecone
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from langchain_core.documents import Document
 from euriai.langchain import EuriaiEmbeddings
 
 from src.config import Config
+from src.components.local_vector_index import get_local_vector_index
+from src.components.index_alias_registry import IndexAliasRegistry
+from src.utils.deadline import Deadline
 from src.logger import logging
 from src.exception import CustomException
 
 
 class VectorDBClient:
-    def __init__(self):
+    def __init__(self, index_name: Optional[str] = None, use_aliases: bool = True):
+        """
+        Args:
+            index_name (str, optional): Pinecone index to use instead of Config.PINECONE_INDEX_NAME.
+            use_aliases (bool): Resolve logical namespaces through the IndexAliasRegistry.
+                Disabled by the bulk re-index, which writes to physical namespaces directly.
+        """
         try:
             logging.info("Initializing VectorDBClient")
             self.config = Config()
-            # Initialize Pinecone
-            self.pc = Pinecone(api_key=self.config.PINECONE_API_KEY.strip('"').strip("'"))
-            self.index = self.pc.Index(self.config.PINECONE_INDEX_NAME.strip('"').strip("'"))
+            self.index_name = (index_name or self.config.PINECONE_INDEX_NAME).strip('"').strip("'")
+            self._indexes = {}
+            self.aliases = None
+            # Initialize Pinecone, or the in-memory index for local runs
+            if self.config.VECTOR_DB_BACKEND == "local":
+                logging.info("Using local in-memory vector index")
+                self.index = get_local_vector_index()
+            else:
+                self.pc = Pinecone(api_key=self.config.PINECONE_API_KEY.strip('"').strip("'"))
+                self.index = self._get_index(self.index_name)
+                if use_aliases and index_name is None:
+                    self.aliases = IndexAliasRegistry()
             # Initialize Embeddings
             self.embeddings_model = EuriaiEmbeddings(api_key=self.config.EURIAI_API_KEY.strip('"').strip("'"), model=self.config.OPENAI_EMBEDDING_MODEL.strip('"').strip("'"))
         except Exception as e:
             logging.error(f"Error initializing VectorDBClient: {str(e)}")
             raise CustomException(e, sys)
+
+
+    def _get_index(self, index_name: str):
+        if index_name not in self._indexes:
+            self._indexes[index_name] = self.pc.Index(index_name)
+        return self._indexes[index_name]
+
+
+    def _target(self, namespace: Optional[str]) -> Tuple[object, str]:
+        """Resolve a logical namespace to the index object and physical namespace serving it."""
+        if namespace is None:
+            namespace = self.config.PINECONE_DEFAULT_NAMESPACE
+        if self.aliases is None:
+            return self.index, namespace
+        index_name, physical_namespace = self.aliases.resolve(namespace)
+        return self._get_index(index_name), physical_namespace
+
+
+    def namespace_for(self, collection: Optional[str] = None) -> str:
+        """Map a collection/tenant name to its index namespace."""
+        if not collection or not collection.strip():
+            return self.config.PINECONE_DEFAULT_NAMESPACE
+        namespace = re.sub(r'[^a-z0-9_-]+', '-', collection.strip().lower()).strip('-')
+        if not namespace:
+            raise ValueError(f"Invalid collection name: {collection}")
+        return namespace
         
 
-    def store_embeddings(self, documents: List[Document]) -> bool:
+    def store_embeddings(self, documents: List[Document], ids: Optional[List[str]] = None, namespace: Optional[str] = None, deadline: Optional[Deadline] = None) -> bool:
+        """
+        Embed and upsert documents in batches of Config.EMBEDDING_BATCH_SIZE.
+        Chunk ids default to '<source>_<position>' unless explicit ids are given.
+        The deadline is checked before every batch.
+        """
         try:
             logging.info(f"Storing {len(documents)} document embeddings to Pinecone.")
             # validate documents
             if not documents:
                 raise ValueError("No documents provided for embedding storage.")
-            # Generate embeddings
-            texts = [doc.page_content for doc in documents]
-            embeddings = self.embeddings_model.embed_documents(texts)
-            # Prepare data for upsert
-            to_upsert = []
-            for idx, (doc, embedding) in enumerate(zip(documents, embeddings)):
-                # Create unique ID for each chunk
-                chunk_id = f"{documents[idx].metadata['source']}_{idx}"
-                # Create record
-                record = {
-                    "id": chunk_id,
-                    "values": embedding,
-                    "metadata": documents[idx].metadata
-                }
-                to_upsert.append(record)
-            # Upsert to Pinecone
-            try:
-                self.index.upsert(vectors=to_upsert)
-                logging.info("Embeddings stored successfully.")
-                return True
-            except Exception as e:
-                logging.error(f"Error upserting embeddings to Pinecone: {str(e)}")
-                return False
+            if ids is not None and len(ids) != len(documents):
+                raise ValueError("Number of ids must match number of documents.")
+            index, namespace = self._target(namespace)
+            batch_size = self.config.EMBEDDING_BATCH_SIZE
+            for start in range(0, len(documents), batch_size):
+                if deadline is not None:
+                    deadline.check("embeddings")
+                batch = documents[start:start + batch_size]
+                # Generate embeddings
+                texts = [doc.page_content for doc in batch]
+                embeddings = self.embeddings_model.embed_documents(texts)
+                # Prepare data for upsert
+                to_upsert = []
+                for offset, (doc, embedding) in enumerate(zip(batch, embeddings)):
+                    # Create unique ID for each chunk
+                    chunk_id = ids[start + offset] if ids is not None else f"{doc.metadata['source']}_{start + offset}"
+                    # Create record
+                    record = {
+                        "id": chunk_id,
+                        "values": embedding,
+                        "metadata": doc.metadata
+                    }
+                    to_upsert.append(record)
+                # Upsert to Pinecone
+                try:
+                    index.upsert(vectors=to_upsert, namespace=namespace)
+                except Exception as e:
+                    logging.error(f"Error upserting embeddings to Pinecone: {str(e)}")
+                    return False
+            logging.info("Embeddings stored successfully.")
+            return True
         except Exception as e:
             logging.error(f"Error in store_embeddings: {str(e)}")
             raise CustomException(e, sys)
+
+
+    def fetch_metadata(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, Dict]:
+        """Return the stored metadata for the given record ids that exist in the index."""
+        try:
+            logging.info(f"Fetching metadata for {len(ids)} records from Pinecone.")
+            index, namespace = self._target(namespace)
+            metadata = {}
+            batch_size = self.config.EMBEDDING_BATCH_SIZE
+            for start in range(0, len(ids), batch_size):
+                response = index.fetch(ids=ids[start:start + batch_size], namespace=namespace)
+                for record_id, vector in response.vectors.items():
+                    metadata[record_id] = vector.metadata or {}
+            logging.info(f"Fetched metadata for {len(metadata)} records.")
+            return metadata
+        except Exception as e:
+            logging.error(f"Error in fetch_metadata: {str(e)}")
+            raise CustomException(e, sys)
         
         
-    def query_similar(self, query: str, top_k: int = 5) -> List[Dict]:
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> None:
+        """Delete records by id, in batches of Config.EMBEDDING_BATCH_SIZE."""
+        try:
+            logging.info(f"Deleting {len(ids)} records from Pinecone.")
+            index, namespace = self._target(namespace)
+            batch_size = self.config.EMBEDDING_BATCH_SIZE
+            for start in range(0, len(ids), batch_size):
+                index.delete(ids=ids[start:start + batch_size], namespace=namespace)
+            logging.info("Records deleted successfully.")
+        except Exception as e:
+            logging.error(f"Error in delete: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    def query_similar(self, query: str, top_k: int = 5, metadata_filter: Optional[Dict] = None, namespace: Optional[str] = None, deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        Query the most similar chunks. The metadata filter and namespace are pushed
+        down into the index query, so scoped searches only scan matching records.
+        """
         try:
-            logging.info(f"Querying similar documents for query: {query}")
+            logging.info(f"Querying similar documents for query: {query} (namespace: '{namespace or ''}', filter: {metadata_filter})")
+            index, namespace = self._target(namespace)
             # Generate embedding for the query
+            if deadline is not None:
+                deadline.check("query_embedding")
             query_embedding = self.embeddings_model.embed_query(query)
+            if deadline is not None:
+                deadline.check("vector_query")
             # Query Pinecone
-            results = self.index.query(
+            results = index.query(
                 vector=query_embedding,
                 top_k=top_k,
-                include_metadata=True
+                filter=metadata_filter,
+                include_metadata=True,
+                namespace=namespace
             )
             logging.info(f"Retrieved {len(results['matches'])} similar documents.")
             return results['matches']
@@ -11,9 +11,71 @@ class Config:
     GEMINI_2_5_FLASH_MODEL = "gemini-2.5-flash"
     TEMPERATURE = 0.3
 
+    # LLM scheduler: per-model rate limits, concurrency and retries
+    LLM_DEFAULT_RATE_LIMIT = {"requests_per_minute": 60, "tokens_per_minute": 100000, "max_concurrency": 4}
+    LLM_RATE_LIMITS = {
+        LLaMA_4_SCOUT_MODEL: {"requests_per_minute": 60, "tokens_per_minute": 150000, "max_concurrency": 8},
+        GPT_4_1_NANO_MODEL: {"requests_per_minute": 100, "tokens_per_minute": 200000, "max_concurrency": 8},
+        GEMINI_2_5_FLASH_MODEL: {"requests_per_minute": 60, "tokens_per_minute": 150000, "max_concurrency": 8},
+    }
+    LLM_COMPLETION_TOKENS_ESTIMATE = 1024
+    LLM_MAX_RETRIES = 3
+    LLM_BACKOFF_BASE_SECONDS = 1.0
+    LLM_BACKOFF_MAX_SECONDS = 30.0
+
+    # Per-task model routing: primary model, ordered fallbacks and optional hedging.
+    # Hedge deadline is hedge_after_seconds if set, else the primary's rolling latency quantile.
+    TASK_ROUTING = {
+        "explain": {"primary": LLaMA_4_SCOUT_MODEL, "fallbacks": [GPT_4_1_NANO_MODEL, GEMINI_2_5_FLASH_MODEL], "hedge": True, "hedge_after_seconds": None},
+        "quiz": {"primary": GPT_4_1_NANO_MODEL, "fallbacks": [LLaMA_4_SCOUT_MODEL, GEMINI_2_5_FLASH_MODEL], "hedge": True, "hedge_after_seconds": None},
+        "summary": {"primary": GEMINI_2_5_FLASH_MODEL, "fallbacks": [LLaMA_4_SCOUT_MODEL, GPT_4_1_NANO_MODEL], "hedge": True, "hedge_after_seconds": None},
+    }
+    HEDGE_LATENCY_QUANTILE = 0.9
+    HEDGE_MIN_SAMPLES = 20               # latency samples needed before using the rolling quantile
+    HEDGE_DEFAULT_DEADLINE_SECONDS = 10.0
+    ROUTER_MAX_WORKERS = 32
+
+    # Per-request deadlines: clients send their timeout in REQUEST_DEADLINE_HEADER (seconds)
+    REQUEST_DEADLINE_HEADER = "X-Request-Timeout"
+    REQUEST_DEADLINE_SECONDS = 60.0          # budget when the client sends none
+    REQUEST_DEADLINE_MAX_SECONDS = 300.0
+    DEADLINE_SAFETY_MARGIN_SECONDS = 0.5     # kept back for sending the response
+    DEADLINE_MIN_BUDGET_SECONDS = 1.0        # smaller budgets are shed on arrival
+    DEADLINE_SHED_QUANTILE = 0.5             # shed when the budget is below this latency quantile
+    DEADLINE_SHED_MIN_SAMPLES = 20
+    DISCONNECT_POLL_SECONDS = 0.25
+
+    # Assumed LLM formatter latency for "saved latency" metrics until real samples exist
+    FORMATTER_LLM_LATENCY_ESTIMATE_SECONDS = 3.0
+
+    # Standard PDF text extraction: large PDFs are split into page ranges across processes
+    PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', os.cpu_count() or 1))
+    PDF_PARALLEL_MIN_PAGES = 100     # smaller PDFs are extracted serially
+    PDF_PAGES_PER_SHARD = 25
+
     PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
     PINECONE_INDEX_NAME = 'fineduguide-index'
+    PINECONE_DEFAULT_NAMESPACE = ''   # namespace for uploads without a collection
+    VECTOR_DB_BACKEND = os.getenv('VECTOR_DB_BACKEND', 'pinecone')   # "pinecone" or "local" (in-memory)
+    EMBEDDING_BATCH_SIZE = 100
+
+    # Hierarchical document summaries built after ingestion
+    SUMMARY_TREE_LEVELS = ("group", "section", "document")   # finest to coarsest
+    SUMMARY_TREE_ENABLED = os.getenv('SUMMARY_TREE_ENABLED', 'false').lower() == 'true'
+    SUMMARY_TREE_GROUP_SIZE = 5      # chunks per chunk-group summary
+    SUMMARY_TREE_SECTION_SIZE = 5    # chunk-group summaries per section summary
+    SUMMARY_TREE_MAX_WORKERS = 4     # concurrent LLM summary calls per level
 
     AWS_ACCESS_KEY = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
-    AWS_BUCKET_NAME = 'fineduguide-bucket'
\ No newline at end of file
+    AWS_BUCKET_NAME = 'fineduguide-bucket'
+    S3_COLLECTIONS_PREFIX = 'collections'   # collection uploads are archived as collections/<namespace>/<filename>
+
+    # Logical -> physical namespace aliases, swapped atomically by the bulk re-index
+    INDEX_ALIAS_KEY = '_index/aliases.json'
+    INDEX_ALIAS_TTL_SECONDS = 30
+
+    # Bulk re-index defaults
+    REINDEX_DOWNLOAD_WORKERS = 8
+    REINDEX_PROCESS_WORKERS = os.cpu_count() or 2
+    REINDEX_UPSERT_BATCH_SIZE = 500
\ No newline at end of file
@@ -0,0 +1,286 @@
+"""
+Bulk re-index: rebuild the vector index from the documents archived in S3.
+
+    python -m src.pipeline.bulk_reindex --pdf-processing-method "standard text extraction"
+    python -m src.pipeline.bulk_reindex --resume            # continue an interrupted run
+    python -m src.pipeline.bulk_reindex --index-name fineduguide-index-v2   # e.g. new embedding dimension
+    python -m src.pipeline.bulk_reindex --summary-trees     # also rebuild hierarchical summaries
+
+Objects are listed page by page, downloaded with bounded parallelism, extracted
+and chunked in a process pool, then embedded and upserted in large batches into
+fresh versioned namespaces (one per collection). With --summary-trees (default
+Config.SUMMARY_TREE_ENABLED) each document's summary tree is rebuilt in the new
+namespace at batch priority; without it, summary requests fall back to chunk
+retrieval after the swap. Once every document is indexed the collection aliases
+are swapped in a single write, so readers move to the new namespaces atomically.
+Progress is checkpointed after every upserted batch.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.components.S3_storage_service import S3Storage
+from src.components.vector_db_client import VectorDBClient
+from src.components.index_alias_registry import IndexAliasRegistry
+from src.components.summary_tree_builder import SummaryTreeBuilder
+from src.logger import logging
+from src.exception import CustomException
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+# Physical name of the unscoped namespace; namespace_for only yields [a-z0-9_-], so no collection can map to it
+UNSCOPED_NAMESPACE_TOKEN = "@default"
+
+
+def extract_and_chunk(file_path: str, pdf_processing_method: str, collection: Optional[str], uploaded_at: Optional[int]) -> List:
+    """Process-pool worker: extract, clean and chunk one downloaded document, keeping its original upload time."""
+    from src.components.input_handler import UserInputHandler
+    # Documents are already processed in parallel; don't nest a page-extraction pool per worker
+    Config.PDF_EXTRACTION_WORKERS = 1
+    method = pdf_processing_method if file_path.endswith(".pdf") else None
+    return UserInputHandler().process_file(file_path, PDF_Processing_Method=method, collection=collection, uploaded_at=uploaded_at)
+
+
+class ReindexCheckpoint:
+    """JSON checkpoint of completed objects, written atomically after every batch."""
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {"version": None, "index_name": None, "namespaces": {}, "completed": [], "failed": {}, "chunks": 0}
+        if os.path.exists(path):
+            with open(path) as file_obj:
+                self.state.update(json.load(file_obj))
+        self.completed = set(self.state["completed"])
+
+
+    def save(self) -> None:
+        self.state["completed"] = sorted(self.completed)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file_obj:
+            json.dump(self.state, file_obj)
+        os.replace(temp_path, self.path)
+
+
+class BulkReindexer:
+    def __init__(self, args: argparse.Namespace):
+        try:
+            logging.info("Initializing BulkReindexer")
+            self.args = args
+            self.s3_storage = S3Storage()
+            self.checkpoint = ReindexCheckpoint(args.checkpoint)
+            self.registry = IndexAliasRegistry(self.s3_storage)
+            if not args.resume or not self.checkpoint.state["version"]:
+                # Without --index-name, rebuild on the index readers currently use
+                index_name = args.index_name or self.registry.resolve(Config.PINECONE_DEFAULT_NAMESPACE)[0]
+                self.checkpoint.state.update({"version": time.strftime("v%Y%m%d%H%M%S"), "index_name": index_name, "namespaces": {}, "completed": [], "failed": {}, "chunks": 0})
+                self.checkpoint.completed = set()
+            # Writes go to physical namespaces, bypassing the live aliases
+            self.vector_db_client = VectorDBClient(index_name=self.checkpoint.state["index_name"], use_aliases=False)
+            # Summaries are generated at Priority.BATCH, so they yield to live traffic
+            self.summary_tree_builder = SummaryTreeBuilder(vector_db_client=self.vector_db_client) if args.summary_trees else None
+            self.pending_documents: List = []
+            self.pending_ids: List[str] = []
+            self.pending_keys: Dict[str, Tuple[str, List]] = {}
+            self.stats = {"docs": 0, "chunks": 0, "started_at": time.monotonic()}
+            self.last_modified: Dict[str, int] = {}
+        except Exception as e:
+            logging.error(f"Error initializing BulkReindexer: {str(e)}")
+            raise CustomException(e, sys)
+
+
+    def physical_namespace(self, logical_namespace: str) -> str:
+        namespaces = self.checkpoint.state["namespaces"]
+        if logical_namespace not in namespaces:
+            namespaces[logical_namespace] = f"{logical_namespace or UNSCOPED_NAMESPACE_TOKEN}__{self.checkpoint.state['version']}"
+        return namespaces[logical_namespace]
+
+
+    def list_pending_keys(self) -> List[str]:
+        keys = []
+        for item in self.s3_storage.list_files(prefix=self.args.prefix):
+            key = item["Key"]
+            if key.startswith(os.path.dirname(Config.INDEX_ALIAS_KEY) + "/") or not key.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if key not in self.checkpoint.completed:
+                keys.append(key)
+                if item.get("LastModified") is not None:
+                    self.last_modified[key] = int(item["LastModified"].timestamp())
+        return keys
+
+
+    def uploaded_at(self, key: str, metadata: Dict[str, str]) -> Optional[int]:
+        """Original upload time: saved in the object metadata at upload, else the object's LastModified."""
+        try:
+            return int(metadata["uploaded_at"])
+        except (KeyError, ValueError):
+            return self.last_modified.get(key)
+
+
+    def collection_for(self, key: str, metadata: Dict[str, str]) -> Optional[str]:
+        """Collection of an archived object: its key prefix, else the metadata of objects archived before prefixes."""
+        namespace = S3Storage.namespace_from_key(key)
+        collection = metadata.get("collection")
+        if namespace is None:
+            return collection
+        # The prefix decides the namespace; the metadata keeps the collection name as uploaded
+        return collection if collection and self.vector_db_client.namespace_for(collection) == namespace else namespace
+
+
+    def download(self, key: str, temp_dir: str) -> Tuple[str, Optional[str], Dict]:
+        # Keep the original filename (chunk metadata uses it as the document source)
+        # in a per-object directory so equal basenames under different prefixes don't clash
+        file_path = os.path.join(tempfile.mkdtemp(dir=temp_dir), os.path.basename(key))
+        try:
+            metadata = self.s3_storage.download_file(key, file_path)
+            return key, file_path, metadata
+        except CustomException as e:
+            logging.error(f"Failed to download {key}: {str(e)}")
+            self.checkpoint.state["failed"][key] = str(e)
+            return key, None, {}
+
+
+    def queue_documents(self, key: str, documents: List, namespace: str) -> None:
+        source = documents[0].metadata["source"] if documents else key
+        for idx, document in enumerate(documents):
+            self.pending_documents.append((namespace, document))
+            self.pending_ids.append(f"{source}_{idx}")
+        self.pending_keys[key] = (namespace, documents)
+        if len(self.pending_documents) >= self.args.batch_size:
+            self.flush()
+
+
+    def flush(self) -> None:
+        """Embed/upsert queued chunks per namespace, rebuild summary trees, then checkpoint the documents as done."""
+        by_namespace: Dict[str, Tuple[List, List[str]]] = {}
+        for (namespace, document), chunk_id in zip(self.pending_documents, self.pending_ids):
+            documents, ids = by_namespace.setdefault(namespace, ([], []))
+            documents.append(document)
+            ids.append(chunk_id)
+        for namespace, (documents, ids) in by_namespace.items():
+            if not self.vector_db_client.store_embeddings(documents, ids=ids, namespace=namespace):
+                raise RuntimeError(f"Upsert into namespace {namespace} failed")
+        completed = list(self.pending_keys)
+        if self.summary_tree_builder is not None:
+            completed = [key for key, (namespace, documents) in self.pending_keys.items() if self.build_summary_tree(key, documents, namespace)]
+        self.stats["chunks"] += len(self.pending_documents)
+        self.stats["docs"] += len(completed)
+        self.checkpoint.state["chunks"] += len(self.pending_documents)
+        self.checkpoint.completed.update(completed)
+        for key in completed:
+            self.checkpoint.state["failed"].pop(key, None)
+        self.checkpoint.save()
+        self.pending_documents, self.pending_ids, self.pending_keys = [], [], {}
+        self.report_progress()
+
+
+    def build_summary_tree(self, key: str, documents: List, namespace: str) -> bool:
+        if not documents:
+            return True
+        try:
+            self.summary_tree_builder.build_tree(documents, namespace=namespace)
+            return True
+        except CustomException as e:
+            # Left out of the checkpoint, so --resume retries the whole document
+            logging.error(f"Failed to build summary tree for {key}: {str(e)}")
+            self.checkpoint.state["failed"][key] = f"summary tree: {str(e)}"
+            return False
+
+
+    def report_progress(self) -> None:
+        elapsed = max(time.monotonic() - self.stats["started_at"], 1e-9)
+        message = (f"Re-indexed {self.stats['docs']} docs / {self.stats['chunks']} chunks "
+                   f"({self.stats['docs'] / elapsed:.2f} docs/sec, {self.stats['chunks'] / elapsed:.1f} chunks/sec)")
+        logging.info(message)
+        print(message)
+
+
+    def run(self) -> Dict:
+        keys = self.list_pending_keys()
+        print(f"{len(keys)} documents to re-index ({len(self.checkpoint.completed)} already done), version {self.checkpoint.state['version']}")
+        window = self.args.download_workers * 4
+        # Workers are spawned rather than forked, since the download threads are already running
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                ThreadPoolExecutor(max_workers=self.args.download_workers) as downloader, \
+                ProcessPoolExecutor(max_workers=self.args.process_workers, mp_context=multiprocessing.get_context("spawn")) as processor:
+            # Bounded windows keep at most `window` downloaded files on disk at a time
+            for start in range(0, len(keys), window):
+                downloads = list(downloader.map(lambda key: self.download(key, temp_dir), keys[start:start + window]))
+                futures = []
+                for key, file_path, metadata in downloads:
+                    if file_path is None:
+                        continue
+                    collection = self.collection_for(key, metadata)
+                    uploaded_at = self.uploaded_at(key, metadata)
+                    futures.append((key, file_path, collection, processor.submit(extract_and_chunk, file_path, self.args.pdf_processing_method, collection, uploaded_at)))
+                for key, file_path, collection, future in futures:
+                    try:
+                        documents = future.result()
+                        self.queue_documents(key, documents, self.physical_namespace(self.vector_db_client.namespace_for(collection)))
+                    except Exception as e:
+                        logging.error(f"Failed to re-index {key}: {str(e)}")
+                        self.checkpoint.state["failed"][key] = str(e)
+                    finally:
+                        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+            if self.pending_documents:
+                self.flush()
+        self.checkpoint.save()
+        return self.checkpoint.state
+
+
+    def swap(self) -> None:
+        namespaces = self.checkpoint.state["namespaces"]
+        if self.checkpoint.state["failed"] and not self.args.force_swap:
+            print(f"{len(self.checkpoint.state['failed'])} documents failed; not swapping aliases (re-run with --resume, or use --force-swap)")
+            return
+        # A collection missing from this run would be left on its old namespaces (or index)
+        not_rebuilt = self.registry.namespaces_missing_for(namespaces)
+        if not_rebuilt:
+            print(f"Collections {sorted(not_rebuilt)} were not rebuilt in this run; not swapping aliases")
+            return
+        current = self.registry.load(force=True)
+        updated = self.registry.swap(namespaces, index_name=self.checkpoint.state["index_name"])
+        if updated == current:
+            print(f"Aliases already point at {updated['namespaces']} on index {updated['index_name']}; rollback mapping left unchanged")
+            return
+        print(f"Aliases swapped to {updated['namespaces']} on index {updated['index_name']}; previous mapping kept under 'previous' for rollback")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the vector index from the S3 document archive")
+    parser.add_argument("--prefix", default="", help="Only re-index objects under this S3 prefix (implies --no-swap)")
+    parser.add_argument("--pdf-processing-method", default="standard text extraction", choices=("standard text extraction", "ocr based extraction"))
+    parser.add_argument("--index-name", default=None, help="Target Pinecone index (defaults to the configured index)")
+    parser.add_argument("--download-workers", type=int, default=Config.REINDEX_DOWNLOAD_WORKERS)
+    parser.add_argument("--process-workers", type=int, default=Config.REINDEX_PROCESS_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=Config.REINDEX_UPSERT_BATCH_SIZE, help="Chunks per embed/upsert flush")
+    parser.add_argument("--checkpoint", default="reindex_checkpoint.json")
+    parser.add_argument("--resume", action="store_true", help="Continue the run recorded in the checkpoint")
+    parser.add_argument("--no-swap", action="store_true", help="Build the new namespaces without switching readers to them")
+    parser.add_argument("--force-swap", action="store_true", help="Swap aliases even if some documents failed")
+    parser.add_argument("--summary-trees", action=argparse.BooleanOptionalAction, default=Config.SUMMARY_TREE_ENABLED,
+                        help="Rebuild hierarchical summary trees in the new namespaces (LLM calls at batch priority)")
+    args = parser.parse_args()
+    if args.prefix and not args.no_swap:
+        # The new namespaces hold only the prefixed objects, not whole collections
+        print("--prefix re-indexes part of each collection; aliases will not be swapped")
+        args.no_swap = True
+
+    reindexer = BulkReindexer(args)
+    state = reindexer.run()
+    reindexer.report_progress()
+    print(f"Completed {len(state['completed'])} documents, {len(state['failed'])} failed")
+    if not args.summary_trees:
+        print("Summary trees were not rebuilt; summary requests use chunk retrieval until you re-run with --summary-trees")
+    if not args.no_swap:
+        reindexer.swap()
+
+
+if __name__ == "__main__":
+    main()
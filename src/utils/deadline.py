@@ -0,0 +1,96 @@
+import time
+import threading
+from typing import List, Optional
+
+from src.utils.metrics import metrics
+from src.logger import logging
+
+
+class RequestCancelled(Exception):
+    """Raised when work is abandoned because its caller went away (or lost a hedge race)."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget runs out, or is too small for the next stage."""
+
+
+class Deadline:
+    """
+    Time budget and cancellation signal for one request, checked by each stage
+    of the pipeline (file processing, embeddings, retrieval, LLM calls).
+
+    `cancel_event` is set by `cancel()` and lets blocking waits (the LLM
+    scheduler queue, retry backoff) wake up as soon as the request is abandoned.
+    A budget of None never expires but can still be cancelled.
+    """
+    def __init__(self, budget_seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + budget_seconds if budget_seconds is not None else float("inf")
+        self.cancel_event = threading.Event()
+        self.reason: Optional[str] = None
+        self._children: List["Deadline"] = []
+        self._lock = threading.Lock()
+
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+    @property
+    def done(self) -> bool:
+        return self.cancelled or self.expired
+
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self.cancel_event.is_set():
+                return
+            self.reason = reason
+            self.cancel_event.set()
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+
+
+    def child(self) -> "Deadline":
+        """Deadline with the same expiry that can be cancelled on its own, and is cancelled with its parent."""
+        child = Deadline()
+        child.expires_at = self.expires_at
+        with self._lock:
+            self._children.append(child)
+            if self.cancel_event.is_set():
+                child.cancel(self.reason)
+        return child
+
+
+    def extend_to(self, other: "Deadline") -> None:
+        """Keep this deadline alive at least as long as `other` (used for shared computations)."""
+        self.expires_at = max(self.expires_at, other.expires_at)
+
+
+    def check(self, stage: str) -> None:
+        """Raise if the request was cancelled or its budget has run out before `stage`."""
+        if self.cancelled:
+            metrics.increment(f"deadline.{stage}.cancelled")
+            raise RequestCancelled(f"Request {self.reason} before {stage}")
+        if self.expired:
+            metrics.increment(f"deadline.{stage}.expired")
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
+
+
+    def require(self, seconds: float, stage: str) -> None:
+        """Shed work that cannot finish in time: raise unless `seconds` of budget remain for `stage`."""
+        self.check(stage)
+        if self.remaining() < seconds:
+            metrics.increment(f"deadline.{stage}.shed")
+            logging.info(f"Shedding {stage}: {self.remaining():.2f}s left, {seconds:.2f}s expected")
+            raise DeadlineExceeded(f"Not enough time left for {stage} ({self.remaining():.2f}s < {seconds:.2f}s)")
@@ -0,0 +1,126 @@
+import re
+import sys
+from typing import List, Dict
+
+from src.logger import logging
+from src.exception import CustomException
+
+
+class QuizParseError(ValueError):
+    """Raised when quiz text does not follow the Q1./A)-D)/Correct Answer: layout."""
+
+
+# Markdown emphasis/heading markers an LLM may wrap around the layout keywords
+_DECORATION = r'[\s*_#>]*'
+QUESTION_PATTERN = re.compile(rf'^{_DECORATION}(?:Q(?:uestion)?\s*)(\d+)\s*[.):]{_DECORATION}\s*(.*)$', re.IGNORECASE)
+OPTION_PATTERN = re.compile(rf'^{_DECORATION}(?:[-•]\s*)?\(?([A-D])[).:]{_DECORATION}\s*(.+)$')
+ANSWER_PATTERN = re.compile(rf'^{_DECORATION}(?:Correct\s+)?Answer{_DECORATION}\s*[:\-]{_DECORATION}\s*\(?([A-D])\b.*$', re.IGNORECASE)
+PREAMBLE_PATTERN = re.compile(r'^\s*(here is|here\'s|here are|sure|certainly)\b[^\n]*:\s*\n+', re.IGNORECASE)
+CODE_FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+
+
+class LocalFormatter:
+    """
+    Deterministic formatter used instead of a second LLM round trip.
+    Parses quizzes produced with quiz_prompt_template into structured data and
+    applies rule-based markdown normalization to explanations and summaries.
+    """
+    def __init__(self) -> None:
+        pass
+
+
+    ## Quiz parsing
+    def parse_quiz(self, quiz: str) -> List[Dict]:
+        questions: List[Dict] = []
+        current = None
+        for raw_line in quiz.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            question_match = QUESTION_PATTERN.match(line)
+            answer_match = ANSWER_PATTERN.match(line)
+            option_match = OPTION_PATTERN.match(line)
+            if question_match:
+                current = {"number": int(question_match.group(1)), "question": question_match.group(2).strip(" *_"), "options": {}, "answer": None}
+                questions.append(current)
+            elif current is None:
+                # Text before the first question (e.g. a title) is ignored
+                continue
+            elif answer_match:
+                current["answer"] = answer_match.group(1).upper()
+            elif option_match:
+                current["options"][option_match.group(1).upper()] = option_match.group(2).strip(" *_")
+            elif not current["options"]:
+                # Question text wrapped onto several lines
+                current["question"] = f"{current['question']} {line.strip(' *_')}".strip()
+
+        if not questions:
+            raise QuizParseError("No questions found")
+        for question in questions:
+            if not question["question"]:
+                raise QuizParseError(f"Question {question['number']} has no text")
+            if sorted(question["options"]) != ["A", "B", "C", "D"]:
+                raise QuizParseError(f"Question {question['number']} does not have options A-D")
+            if question["answer"] not in question["options"]:
+                raise QuizParseError(f"Question {question['number']} has no valid correct answer")
+        return questions
+
+
+    def render_quiz_markdown(self, questions: List[Dict]) -> str:
+        blocks = []
+        for idx, question in enumerate(questions, start=1):
+            lines = [f"**Q{idx}. {question['question']}**", ""]
+            lines += [f"- {letter}) {question['options'][letter]}" for letter in ("A", "B", "C", "D")]
+            lines += ["", f"**Correct Answer:** {question['answer']}) {question['options'][question['answer']]}"]
+            blocks.append("\n".join(lines))
+        return "\n\n---\n\n".join(blocks)
+
+
+    @staticmethod
+    def looks_like_quiz(text: str) -> bool:
+        # Option or answer lines mark a quiz even when its questions are numbered differently
+        patterns = (QUESTION_PATTERN, OPTION_PATTERN, ANSWER_PATTERN)
+        return any(pattern.match(line.strip()) for line in text.splitlines() for pattern in patterns)
+
+
+    ## Markdown normalization for explanations and summaries
+    def normalize_markdown(self, content: str) -> str:
+        try:
+            text = content.replace("\r\n", "\n").replace("\r", "\n")
+            # Drop "Here is the formatted content:" style preambles
+            text = PREAMBLE_PATTERN.sub("", text, count=1)
+            lines = []
+            in_code_block = False
+            for line in text.split("\n"):
+                if CODE_FENCE_PATTERN.match(line):
+                    in_code_block = not in_code_block
+                    lines.append(line.rstrip())
+                    continue
+                if in_code_block:
+                    # Fenced code is kept verbatim
+                    lines.append(line)
+                    continue
+                line = line.rstrip()
+                if not line:
+                    # At most one blank line in a row
+                    if lines and lines[-1] != "":
+                        lines.append("")
+                    continue
+                # Unify bullet markers
+                line = re.sub(r'^(\s*)[•◦▪●*–]\s+', r'\1- ', line)
+                # "1)" numbered items become markdown "1."
+                line = re.sub(r'^(\s*)(\d+)\)\s+', r'\1\2. ', line)
+                # Headings need a space after the hashes ("#1 priority" is prose, not a heading)
+                line = re.sub(r'^(#{1,6})([^#\s\d])', r'\1 \2', line)
+                is_heading = bool(re.match(r'^#{1,6} ', line))
+                is_block_start = is_heading or bool(re.match(r'^(\s*- |\s*\d+\. )', line))
+                # Blank line before headings, and before a list that follows a paragraph
+                if lines and lines[-1] != "" and (is_heading or (is_block_start and not re.match(r'^(\s*- |\s*\d+\. )', lines[-1]))):
+                    lines.append("")
+                lines.append(line)
+                if is_heading:
+                    lines.append("")
+            return "\n".join(lines).strip()
+        except Exception as e:
+            logging.error(f"Error normalizing markdown: {str(e)}")
+            raise CustomException(e, sys)
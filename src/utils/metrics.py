@@ -0,0 +1,88 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Deque, List
+
+
+def _quantile(sorted_values: List[float], quantile: float) -> float:
+    rank = min(len(sorted_values) - 1, max(0, int(round(quantile * (len(sorted_values) - 1)))))
+    return sorted_values[rank]
+
+
+class Metrics:
+    """
+    Thread-safe in-process registry for counters, gauges and latency histograms.
+    A snapshot of every metric is exposed by the /metrics endpoint.
+    """
+    HISTOGRAM_WINDOW = 1000
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.HISTOGRAM_WINDOW))
+
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._histograms[name].append(value)
+
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+
+    def count(self, name: str) -> int:
+        """Number of samples currently held for a histogram."""
+        with self._lock:
+            return len(self._histograms.get(name, ()))
+
+
+    def mean(self, name: str, default: float = 0.0) -> float:
+        with self._lock:
+            values = list(self._histograms.get(name, ()))
+        return sum(values) / len(values) if values else default
+
+
+    def percentile(self, name: str, quantile: float) -> float:
+        with self._lock:
+            values = sorted(self._histograms.get(name, ()))
+        if not values:
+            return 0.0
+        return _quantile(values, quantile)
+
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            histograms = {name: sorted(values) for name, values in self._histograms.items()}
+            snapshot = {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {}
+            }
+        for name, values in histograms.items():
+            if not values:
+                continue
+            snapshot["histograms"][name] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": _quantile(values, 0.5),
+                "p90": _quantile(values, 0.9),
+                "p99": _quantile(values, 0.99),
+                "max": values[-1]
+            }
+        return snapshot
+
+
+# Shared registry used by all components
+metrics = Metrics()
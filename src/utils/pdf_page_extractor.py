@@ -0,0 +1,50 @@
+"""
+Page-range PDF text extraction for worker processes.
+
+PyMuPDF documents can't be shared across threads or processes, so each worker
+opens the file itself and extracts its own page range. This module only imports
+PyMuPDF so that spawned workers start quickly (ProcessFileUtils pulls in EasyOCR).
+"""
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+import fitz
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of the PDF, in order."""
+    doc = fitz.open(file_path)
+    try:
+        return [doc[page_num].get_text() for page_num in range(start, stop)]
+    finally:
+        doc.close()
+
+
+_shared_pool: Optional[ProcessPoolExecutor] = None
+_shared_pool_workers = 0
+_shared_pool_lock = threading.Lock()
+
+
+def get_pdf_extraction_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by all PDF extractions, created on first use.
+    Workers are spawned rather than forked, since the API server is multi-threaded.
+    """
+    global _shared_pool, _shared_pool_workers
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_workers != max_workers:
+            if _shared_pool is not None:
+                _shared_pool.shutdown(wait=False, cancel_futures=True)
+            _shared_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _shared_pool_workers = max_workers
+        return _shared_pool
+
+
+def reset_pdf_extraction_pool() -> None:
+    """Drop the shared pool (e.g. after a worker crashed); the next extraction starts a new one."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.shutdown(wait=False, cancel_futures=True)
+            _shared_pool = None
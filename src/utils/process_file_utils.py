@@ -1,47 +1,113 @@
 import sys
 import os
 import re
-from typing import List, Dict
+from bisect import bisect_right
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple
 import fitz
 import easyocr
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+from src.config import Config
+from src.utils.deadline import Deadline
+from src.utils.pdf_page_extractor import extract_page_range, get_pdf_extraction_pool, reset_pdf_extraction_pool
 from src.logger import logging
 from src.exception import CustomException
 
 
 
 class ProcessFileUtils:
+    DEADLINE_POLL_SECONDS = 0.1
+
     def __init__(self) -> None:
         pass
 
 
     ## Standard Text Extraction
-    def extract_pdf_text(self, file_path: str) -> str:
+    def extract_pdf_text(self, file_path: str, deadline: Optional[Deadline] = None) -> str:
+        return "".join(self.extract_pdf_pages(file_path, deadline=deadline))
+
+
+    def extract_pdf_pages(self, file_path: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """
+        Return the text of every page, in page order.
+        PDFs with at least Config.PDF_PARALLEL_MIN_PAGES pages are split into page ranges
+        extracted in a process pool of Config.PDF_EXTRACTION_WORKERS workers.
+        """
         try:
             logging.info(f"Extracting text from PDF: {file_path}")
-            doc = fitz.open(file_path)
-            text = ""
-            for page_num, page in enumerate(doc):
-                text += page.get_text()
-                logging.debug(f"Extracted text from page {page_num + 1}")
-            doc.close()
-            logging.info(f"Successfully extracted {len(text)} characters from PDF")
-            return text
+            with fitz.open(file_path) as doc:
+                page_count = doc.page_count
+                if page_count < Config.PDF_PARALLEL_MIN_PAGES or Config.PDF_EXTRACTION_WORKERS <= 1:
+                    pages = self._extract_pages_serial(doc, deadline)
+                else:
+                    pages = None
+            if pages is None:
+                try:
+                    pages = self._extract_pages_parallel(file_path, page_count, deadline)
+                except BrokenProcessPool as e:
+                    logging.warning(f"PDF extraction pool failed ({str(e)}), extracting serially")
+                    reset_pdf_extraction_pool()
+                    with fitz.open(file_path) as doc:
+                        pages = self._extract_pages_serial(doc, deadline)
+            logging.info(f"Successfully extracted {sum(len(page) for page in pages)} characters from {page_count} PDF pages")
+            return pages
         except Exception as e:
             logging.error(f"Error extracting PDF text: {str(e)}")
             raise CustomException(e, sys)
+
+
+    def _extract_pages_serial(self, doc, deadline: Optional[Deadline] = None) -> List[str]:
+        pages = []
+        for page_num, page in enumerate(doc):
+            if deadline is not None:
+                deadline.check("pdf_extraction")
+            pages.append(page.get_text())
+            logging.debug(f"Extracted text from page {page_num + 1}")
+        return pages
+
+
+    def _extract_pages_parallel(self, file_path: str, page_count: int, deadline: Optional[Deadline] = None) -> List[str]:
+        pool = get_pdf_extraction_pool(Config.PDF_EXTRACTION_WORKERS)
+        shard_size = Config.PDF_PAGES_PER_SHARD
+        logging.info(f"Extracting {page_count} pages in shards of {shard_size} across {Config.PDF_EXTRACTION_WORKERS} processes")
+        futures = [
+            pool.submit(extract_page_range, file_path, start, min(start + shard_size, page_count))
+            for start in range(0, page_count, shard_size)
+        ]
+        pages = []
+        try:
+            # Collect shards in page order
+            for future in futures:
+                if deadline is not None:
+                    deadline.check("pdf_extraction")
+                while True:
+                    try:
+                        pages.extend(future.result(timeout=None if deadline is None else self.DEADLINE_POLL_SECONDS))
+                        break
+                    except FutureTimeoutError:
+                        deadline.check("pdf_extraction")
+        except BaseException:
+            # Shards not yet started are dropped; running ones finish in the background
+            for future in futures:
+                future.cancel()
+            raise
+        return pages
         
 
     ## OCR-based Extraction
-    def extract_pdf_text_with_ocr(self, file_path: str) -> str:
+    def extract_pdf_text_with_ocr(self, file_path: str, deadline: Optional[Deadline] = None) -> str:
         logging.info(f"Extracting text from PDF using OCR: {file_path}")
         try:
             reader = easyocr.Reader(['en'], gpu=False)
             doc = fitz.open(file_path)
             text = ""
             for page_num, page in enumerate(doc):
+                # OCR is the slowest stage; stop between pages once the client has gone
+                if deadline is not None:
+                    deadline.check("ocr_extraction")
                 pix = page.get_pixmap()
                 img_path = f"temp_page_{page_num + 1}.png"
                 pix.save(img_path)
@@ -72,13 +138,18 @@ class ProcessFileUtils:
         
 
     ## Cleaning text
+    @staticmethod
+    def _clean(text: str) -> str:
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'[^\w\s.,!?;:\-\'\"()]', '', text)
+        text = re.sub(r' +', ' ', text)
+        return text.strip()
+
+
     def clean_text(self, text: str) -> str:
         try:
             logging.info("Starting text cleaning")
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'[^\w\s.,!?;:\-\'\"()]', '', text)
-            text = re.sub(r' +', ' ', text)
-            cleaned_text = text.strip()
+            cleaned_text = self._clean(text)
             logging.info("Text cleaning completed")
             return cleaned_text
         except Exception as e:
@@ -86,6 +157,31 @@ class ProcessFileUtils:
             raise CustomException(e, sys)
 
 
+    ## Cleaning page texts, keeping the offset at which each page starts
+    def clean_pages(self, pages: List[str]) -> Tuple[str, List[int]]:
+        """
+        Clean and join page texts.
+        Returns the cleaned text and page_offsets, where page_offsets[i] is the
+        character offset at which page i + 1 starts in the cleaned text.
+        """
+        try:
+            logging.info(f"Starting text cleaning for {len(pages)} pages")
+            parts, page_offsets, length = [], [], 0
+            for page in pages:
+                cleaned_page = self._clean(page)
+                if cleaned_page and length:
+                    parts.append(" ")
+                    length += 1
+                page_offsets.append(length)
+                parts.append(cleaned_page)
+                length += len(cleaned_page)
+            logging.info("Text cleaning completed")
+            return "".join(parts), page_offsets
+        except Exception as e:
+            logging.error(f"Error cleaning page texts: {str(e)}")
+            raise CustomException(e, sys)
+
+
     ## text chunking using RecursiveCharacterTextSplitter with metadata
     def generate_chunk_metadata(self, file_path: str, chunk_index: int,chunk_text: str, chunk_size: int, chunk_overlap: int) -> Dict:
         logging.info(f"Generating metadata for chunk {chunk_index} from file {file_path}")
@@ -96,6 +192,7 @@ class ProcessFileUtils:
                 "chunk_index": chunk_index,
                 "chunk_size": chunk_size,
                 "chunk_overlap": chunk_overlap,
+                "level": "chunk",
                 "text": chunk_text
             }
             logging.info(f"Metadata for chunk {chunk_index} generated")
@@ -106,7 +203,11 @@ class ProcessFileUtils:
         
 
     ## text chunking using RecursiveCharacterTextSplitter with metadata
-    def chunk_text(self, text: str, file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Document]:
+    def chunk_text(self, text: str, file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200, page_offsets: Optional[List[int]] = None) -> List[Document]:
+        """
+        Split text into chunk Documents. With page_offsets (from clean_pages),
+        each chunk also records the 1-based page_start and page_end it spans.
+        """
         logging.info("Starting text chunking")
         try:
             text_splitter = RecursiveCharacterTextSplitter(
@@ -116,8 +217,16 @@ class ProcessFileUtils:
             )
             chunks = text_splitter.split_text(text)
             documents = []
+            search_from = 0
             for idx, chunk in enumerate(chunks):
                 metadata = self.generate_chunk_metadata(file_path, idx, chunk, chunk_size, chunk_overlap)
+                if page_offsets:
+                    # Chunks come back in order (and overlap), so search from the previous chunk's start
+                    start = text.find(chunk, search_from)
+                    if start != -1:
+                        search_from = start + 1
+                        metadata["page_start"] = bisect_right(page_offsets, start)
+                        metadata["page_end"] = bisect_right(page_offsets, start + len(chunk) - 1)
                 document = Document(page_content=chunk, metadata=metadata)
                 documents.append(document)
             logging.info(f"Text chunking completed: {len(documents)} chunks created")
@@ -52,4 +52,23 @@ def summary_prompt_template(context: str, question: str) -> str:
             "Topic: {question}\n"
             "Summary:"
         )
-        return template.format(context=context, question=question)
\ No newline at end of file
+        return template.format(context=context, question=question)
+
+
+# Node Summary Prompt Template used while building hierarchical document summaries
+def node_summary_prompt_template(text: str, level: str) -> str:
+        scope = {
+            "group": "a few consecutive passages of a document",
+            "section": "summaries of consecutive parts of a document",
+            "document": "summaries of all sections of a document"
+        }.get(level, "part of a document")
+        template = (
+            "You are FinEduGuide, a specialized AI assistant Expert for Banking and Financial Education.\n"
+            "The text below contains {scope}. Write a concise, self-contained summary of its key points, "
+            "keeping important figures, dates, regulations and defined terms."
+            "Do not add information that is not present in the text and do not add any preamble.\n\n"
+
+            "Text:\n{text}\n\n"
+            "Summary:"
+        )
+        return template.format(scope=scope, text=text)
\ No newline at end of file
@@ -6,20 +6,27 @@ from requests.exceptions import ConnectionError, Timeout
 # Configuration
 FASTAPI_BASE_URL = st.secrets["FASTAPI_BASE_URL"]
 REQUEST_TIMEOUT = 60  # seconds
+# Tell the API how long we will wait, so it stops working on requests we have given up on
+REQUEST_HEADERS = {"X-Request-Timeout": str(REQUEST_TIMEOUT)}
 
 # Upload File helper function
-def upload_file_to_api(file, pdf_processing_method=None):
+def upload_file_to_api(file, pdf_processing_method=None, collection=None):
     files = {"file": (file.name, file, file.type)}
     data = {}
     if pdf_processing_method:
         data["pdf_processing_method"] = pdf_processing_method.lower()
-    return requests.post(f"{FASTAPI_BASE_URL}/upload-file", files=files, data=data, timeout=REQUEST_TIMEOUT)
+    if collection:
+        data["collection"] = collection
+    return requests.post(f"{FASTAPI_BASE_URL}/upload-file", files=files, data=data, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
 
 # Generate Content helper function
-def generate_content_from_api(user_query, task_type):
+def generate_content_from_api(user_query, task_type, collection=None):
+    data = {"user_query": user_query, "task_type": task_type.lower()}
+    if collection:
+        data["collection"] = collection
     return requests.post(
         f"{FASTAPI_BASE_URL}/generate-content",
-        data={"user_query": user_query, "task_type": task_type.lower()}, timeout=REQUEST_TIMEOUT)
+        data=data, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
 
 
 # Page UI
@@ -29,6 +36,7 @@ st.markdown("<h3 style='text-align: center;'>Banking Education Content Generator
 
 # Sidebar – Upload Section
 st.sidebar.title("Settings")
+collection = st.sidebar.text_input("Collection (optional)", help="Uploads and searches are scoped to this collection")
 st.sidebar.header("Upload Document")
 
 uploaded_file = st.sidebar.file_uploader("Choose a file", type=["pdf", "txt"])
@@ -48,7 +56,8 @@ if st.sidebar.button("Upload & Process"):
             with st.spinner("Uploading & processing file..."):
                 response = upload_file_to_api(
                     uploaded_file,
-                    pdf_processing_method
+                    pdf_processing_method,
+                    collection
                 )
             if response.status_code == 200:
                 st.sidebar.success("File uploaded & processed successfully")
@@ -68,7 +77,7 @@ if user_query:
     try:
         with st.chat_message("assistant"):
             with st.spinner("Generating content..."):
-                response = generate_content_from_api(user_query=user_query, task_type=content_type)
+                response = generate_content_from_api(user_query=user_query, task_type=content_type, collection=collection)
 
             # Display generated content and download button
             if response.status_code == 200: